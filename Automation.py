@@ -1,10 +1,9 @@
 from AppOpener import close, open as appopen
 from webbrowser import open as webopen
 from pywhatkit import search, playonyt
-from dotenv import dotenv_values
+from Services import GroqClient
 from bs4 import BeautifulSoup
 from rich import print
-from groq import Groq
 import webbrowser
 import subprocess
 import requests
@@ -12,16 +11,9 @@ import keyboard
 import asyncio
 import os
 
-# Load environment variables
-env_vars = dotenv_values(".env")
-GroqAPIKey = env_vars.get("GroqAPIKey")
-
 # Define constants
 useragent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.75 Safari/537.36'
 
-# Initialize Groq client
-client = Groq(api_key=GroqAPIKey)
-
 # Define system messages
 SystemChatBot = [{"role": "system", "content": f"Hello, I am {os.environ.get('Username', 'User')}. You're a content writer. Write content professionally."}]
 messages = []
@@ -39,9 +31,10 @@ def Content(Topic):
         subprocess.Popen([default_text_editor, File])
 
     def ContentWriterAI(prompt):
+        """Yield the written content token by token as it arrives."""
         messages.append({"role": "user", "content": f"{prompt}"})
 
-        completion = client.chat.completions.create(
+        completion = GroqClient().chat.completions.create(
             model="mixtral-8x7b-32768",
             messages=SystemChatBot + messages,
             max_tokens=2048,
@@ -53,21 +46,23 @@ def Content(Topic):
 
         Answer = ""
         for chunk in completion:
-            if chunk.choices[0].delta.content:
-                Answer += chunk.choices[0].delta.content
+            token = chunk.choices[0].delta.content
+            if token:
+                token = token.replace("</s>", "")
+                Answer += token
+                yield token
 
-        Answer = Answer.replace("</s>", "")
         messages.append({"role": "assistant", "content": Answer})
-        return Answer
 
     Topic = Topic.replace("Content ", "")
-    ContentByAI = ContentWriterAI(Topic)
 
     # Ensure the Data directory exists
     os.makedirs("Data", exist_ok=True)
 
+    # Write the content to disk as it is generated
     with open(rf"Data\{Topic.lower().replace(' ', '')}.txt", "w", encoding="utf-8") as file:
-        file.write(ContentByAI)
+        for token in ContentWriterAI(Topic):
+            file.write(token)
 
     OpenNotepad(rf"Data\{Topic.lower().replace(' ', '')}.txt")
     return True
@@ -141,9 +136,11 @@ async def TranslateAndExecute(commands):
 
 # Automation
 async def Automation(commands):
+    results = []
     async for result in TranslateAndExecute(commands):
         print(result)
-    return True
+        results.append(result)
+    return results
 
 # Example Usage
 if __name__ == "__main__":
@@ -0,0 +1,185 @@
+from collections import deque
+from json import load, loads, dumps
+import threading
+import os
+import re
+
+# Journal locations
+JournalPath = os.path.join("Data", "ChatLog.jsonl")
+LegacyPath = os.path.join("Data", "ChatLog.json")
+ArchivePath = os.path.join("Data", "ChatArchive")
+
+# Number of recent messages kept in memory
+TailSize = 200
+
+# Move the journal into the archive once it holds this many messages
+RotateEvery = 2000
+
+SegmentName = re.compile(r"^(\d+)-(\d+)\.jsonl$")
+
+class ChatStore:
+    """Append-only conversation journal with an in-memory tail cache.
+
+    Every message is stored as one JSON line. Once the journal holds
+    RotateEvery messages it is moved, as is, into an archive segment named
+    after the range of message indices it covers, and a new journal is
+    started. Reads by index only open the segments they need, so no scan
+    grows with the length of the whole history.
+    """
+
+    def __init__(self, path=JournalPath, legacy_path=LegacyPath, archive_path=ArchivePath,
+                 tail_size=TailSize, rotate_every=RotateEvery):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.archive_path = archive_path
+        self.rotate_every = rotate_every
+        self.lock = threading.RLock()
+        self.tail = deque(maxlen=tail_size)
+        self.segments = []  # (start, end, path) of archived messages, oldest first
+        self.base = 0  # Messages in the archive
+        self.count = 0  # Messages in the archive and the journal
+
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            os.makedirs(self.archive_path, exist_ok=True)
+            self._migrate()
+            self._load()
+
+    def _migrate(self):
+        """Import the old Data\\ChatLog.json once, then retire it."""
+        if os.path.exists(self.path) or not os.path.exists(self.legacy_path):
+            return
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                messages = load(f)
+        except (ValueError, OSError) as e:
+            print(f"Error migrating chat log: {e}")
+            messages = []
+
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for message in messages:
+                f.write(dumps(message, ensure_ascii=False) + "\n")
+        os.replace(temp_path, self.path)
+        os.replace(self.legacy_path, self.legacy_path + ".migrated")
+
+    def _load(self):
+        """List the archive and scan the journal to rebuild the tail cache and counters."""
+        self.segments = []
+        for name in os.listdir(self.archive_path):
+            match = SegmentName.match(name)
+            if match:
+                start, end = int(match.group(1)), int(match.group(2))
+                self.segments.append((start, end, os.path.join(self.archive_path, name)))
+        self.segments.sort()
+        self.base = self.segments[-1][1] if self.segments else 0
+
+        self.tail.clear()
+        self.count = self.base
+        if not os.path.exists(self.path):
+            open(self.path, "a", encoding="utf-8").close()
+        else:
+            for message in self._read(self.path):
+                self.tail.append(message)
+                self.count += 1
+
+        # Terminate a torn last line so the next append starts cleanly
+        with open(self.path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+
+        # Top the tail up from the archive after a rotation
+        if len(self.tail) < self.tail.maxlen and self.base:
+            older = self._read_range(max(0, self.base - (self.tail.maxlen - len(self.tail))), self.base)
+            self.tail.extendleft(reversed(older))
+
+    @staticmethod
+    def _parse(line):
+        """Parse one journal line, skipping blank or torn writes."""
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            return loads(line)
+        except ValueError:
+            return None
+
+    def _read(self, path):
+        """Yield the messages of one journal or archive file."""
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                record = self._parse(line)
+                if record is not None:
+                    yield record
+
+    def _read_range(self, start, end):
+        """Read messages [start, end) from the archive segments and the journal."""
+        messages = []
+        files = self.segments + [(self.base, self.count, self.path)]
+        for file_start, file_end, path in files:
+            if file_end <= start or file_start >= end:
+                continue
+            for i, message in enumerate(self._read(path), file_start):
+                if i >= end:
+                    break
+                if i >= start:
+                    messages.append(message)
+        return messages
+
+    def rotate(self):
+        """Move the journal into the archive and start an empty one."""
+        with self.lock:
+            if self.count == self.base:
+                return
+            segment = os.path.join(self.archive_path, f"{self.base:08d}-{self.count:08d}.jsonl")
+            os.replace(self.path, segment)
+            open(self.path, "a", encoding="utf-8").close()
+            self.segments.append((self.base, self.count, segment))
+            self.base = self.count
+
+    def append(self, *messages):
+        """Append one or more messages to the journal."""
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                for message in messages:
+                    f.write(dumps(message, ensure_ascii=False) + "\n")
+                f.flush()
+            self.tail.extend(messages)
+            self.count += len(messages)
+            if self.count - self.base >= self.rotate_every:
+                self.rotate()
+
+    def recent(self, n=None):
+        """Return the last n messages (all cached ones if n is None)."""
+        with self.lock:
+            if n is None:
+                return list(self.tail)
+            if n <= 0:
+                return []
+            return self.slice(self.count - n)
+
+    def slice(self, start, end=None):
+        """Return messages by absolute index, reading only the files that hold them."""
+        with self.lock:
+            end = self.count if end is None else min(end, self.count)
+            start = max(start, 0)
+            if start >= end:
+                return []
+            tail_start = self.count - len(self.tail)
+            if start >= tail_start:
+                tail = list(self.tail)
+                return tail[start - tail_start:end - tail_start]
+            return self._read_range(start, end)
+
+    def messages(self):
+        """Return the whole history, archive included."""
+        return self.slice(0)
+
+    def __len__(self):
+        return self.count
+
+# Shared store used by every backend that reads or writes the chat log
+store = ChatStore()
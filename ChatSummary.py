@@ -0,0 +1,120 @@
+from json import load, dump
+from Services import GroqClient
+from ChatStore import store
+from ContextBuilder import MessageTokens
+import threading
+import os
+
+SummaryPath = os.path.join("Data", "ChatSummary.json")
+
+# Refresh the summary once this many turns are waiting to be folded
+SummarizeEvery = 10
+
+# Most recent messages that always stay verbatim
+KeepVerbatim = 20
+
+# Transcript tokens folded per summarization call
+ChunkTokens = 3000
+
+SummaryModel = "llama3-8b-8192"
+
+SummaryPrompt = """You maintain a running summary of a conversation between a user and an AI assistant.
+*** Merge the new messages into the existing summary. ***
+*** Keep names, facts, preferences and open questions; drop small talk. ***
+*** Reply with the updated summary only, in at most 200 words. ***"""
+
+class RollingSummary:
+    """Running summary of the turns that no longer fit verbatim in the prompt."""
+
+    def __init__(self, store, path=SummaryPath):
+        self.store = store
+        self.path = path
+        self.lock = threading.Lock()
+        self.summary = ""
+        self.covered = 0  # Messages already folded into the summary
+        self.refreshing = False
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = load(f)
+            self.summary = data.get("summary", "")
+            self.covered = data.get("covered", 0)
+        except (OSError, ValueError):
+            pass
+
+    def _save(self):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            dump({"summary": self.summary, "covered": self.covered}, f, indent=4)
+        os.replace(temp_path, self.path)
+
+    def reset(self):
+        """Drop the summary, e.g. after the chat log was cleared."""
+        with self.lock:
+            self.summary = ""
+            self.covered = 0
+            self._save()
+
+    def context(self):
+        """Return the summary messages and the verbatim turns it doesn't cover."""
+        if self.covered > len(self.store):
+            self.reset()
+
+        recent = self.store.recent()
+        first_index = len(self.store) - len(recent)
+        recent = recent[max(self.covered - first_index, 0):]
+
+        if not self.summary:
+            return [], recent
+        return [{"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"}], recent
+
+    def maybe_refresh(self):
+        """Start a background refresh once enough turns are waiting."""
+        pending = len(self.store) - KeepVerbatim - self.covered
+        with self.lock:
+            if self.refreshing or pending < SummarizeEvery * 2:
+                return
+            self.refreshing = True
+        threading.Thread(target=self._refresh, daemon=True).start()
+
+    def _refresh(self):
+        try:
+            end = len(self.store) - KeepVerbatim
+            while self.covered < end:
+                # Fold the backlog in chunks that fit a single request
+                chunk = []
+                tokens = 0
+                for message in self.store.slice(self.covered, end):
+                    tokens += MessageTokens(message)
+                    if chunk and tokens > ChunkTokens:
+                        break
+                    chunk.append(message)
+
+                summary = self._summarize(chunk)
+                with self.lock:
+                    self.summary = summary
+                    self.covered += len(chunk)
+                    self._save()
+        except Exception as e:
+            print(f"Error refreshing chat summary: {e}")
+        finally:
+            with self.lock:
+                self.refreshing = False
+
+    def _summarize(self, chunk):
+        transcript = "\n".join(f"{message['role']}: {message['content']}" for message in chunk)
+        completion = GroqClient().chat.completions.create(
+            model=SummaryModel,
+            messages=[
+                {"role": "system", "content": SummaryPrompt},
+                {"role": "user", "content": f"Existing summary:\n{self.summary or '(none)'}\n\nNew messages:\n{transcript}"}
+            ],
+            max_tokens=512,
+            temperature=0.3,
+            top_p=1,
+            stream=False
+        )
+        return completion.choices[0].message.content.strip()
+
+# Shared summary used by every backend that reads the chat log
+summary = RollingSummary(store)
@@ -1,18 +1,14 @@
-from groq import Groq
-from json import load, dump
 import datetime
-from dotenv import dotenv_values
-import os
-
-# Load environment variables
-env_vars = dotenv_values(".env")
+import threading
+import queue
+from Config import env_vars
+from Services import GroqClient
+from ChatStore import store
+from ContextBuilder import BuildContext
+from ChatSummary import summary
 
 Username = env_vars.get("Username")
 Assistantname = env_vars.get("Assistantname")
-GroqAPIKey = env_vars.get("GroqAPIKey")
-
-# Initialize Groq client
-client = Groq(api_key=GroqAPIKey)
 
 # System prompt
 System = f"""Hello, I am {Username}, You are a very accurate and advanced AI chatbot named {Assistantname} which also has real-time up-to-date information from the internet.
@@ -25,18 +21,6 @@ SystemChatBot = [
     {"role": "system", "content": System}
 ]
 
-# Load chat history
-messages = []
-if not os.path.exists("Data"):
-    os.makedirs("Data")
-
-try:
-    with open(r"Data\ChatLog.json", "r") as f:
-        messages = load(f)
-except FileNotFoundError:
-    with open(r"Data\ChatLog.json", "w") as f:
-        dump([], f)
-
 def RealtimeInformation():
     """Returns real-time information as a string."""
     current_date_time = datetime.datetime.now()
@@ -60,50 +44,113 @@ def AnswerModifier(Answer):
     modified_answer = '\n'.join(non_empty_lines)
     return modified_answer
 
-def ChatBot(Query):
-    """Sends the user's query to the chatbot and returns the AI's response."""
+def StreamAnswer(Query, cancelled=None):
+    """Yields the chatbot's answer token by token without saving it."""
+    # Load the conversation summary and the turns it doesn't cover
+    summary_messages, messages = summary.context()
+
+    # Append user query to messages
+    messages.append({"role": "user", "content": Query})
+
+    # Keep the prompt within the model's context window
+    prompt = BuildContext(
+        SystemChatBot + summary_messages + [{"role": "system", "content": RealtimeInformation()}],
+        messages,
+        max_tokens=1024
+    )
+
+    # Get chatbot response
+    completion = GroqClient().chat.completions.create(
+        model="llama3-70b-8192",
+        messages=prompt,
+        max_tokens=1024,
+        temperature=0.7,
+        top_p=1,
+        stream=True,
+        stop=None
+    )
+
+    for chunk in completion:
+        if cancelled is not None and cancelled.is_set():
+            completion.close()
+            return
+        token = chunk.choices[0].delta.content
+        if token:
+            # Clean up the answer
+            yield token.replace("</s>", "")
+
+def SaveTurn(Query, Answer):
+    """Saves a finished turn to the chat log."""
+    store.append({"role": "user", "content": Query}, {"role": "assistant", "content": Answer})
+    summary.maybe_refresh()
+
+def ChatBotStream(Query):
+    """Yields the AI's response as it arrives and saves the turn once it's complete."""
     try:
-        # Load chat history
-        with open(r"Data\ChatLog.json", "r") as f:
-            messages = load(f)
-
-        # Append user query to messages
-        messages.append({"role": "user", "content": Query})
-
-        # Get chatbot response
-        completion = client.chat.completions.create(
-            model="llama3-70b-8192",
-            messages=SystemChatBot + [{"role": "system", "content": RealtimeInformation()}] + messages,
-            max_tokens=1024,
-            temperature=0.7,
-            top_p=1,
-            stream=True,
-            stop=None
-        )
-
         Answer = ""
-        for chunk in completion:
-            if chunk.choices[0].delta.content:
-                Answer += chunk.choices[0].delta.content
-
-        # Clean up the answer
-        Answer = Answer.replace("</s>", "")
-
-        # Append assistant's response to messages
-        messages.append({"role": "assistant", "content": Answer})
-
-        # Save updated chat history
-        with open(r"Data\ChatLog.json", "w") as f:
-            dump(messages, f, indent=4)
-
-        return AnswerModifier(Answer=Answer)
+        for token in StreamAnswer(Query):
+            Answer += token
+            yield token
+        SaveTurn(Query, Answer)
 
     except Exception as e:
         print(f"Error: {e}")
-        # Reset chat history on error
-        with open(r"Data\ChatLog.json", "w") as f:
-            dump([], f, indent=4)
-        return "Sorry, an error occurred. Please try again."
+        yield "Sorry, an error occurred. Please try again."
+
+def ChatBot(Query):
+    """Sends the user's query to the chatbot and returns the AI's response."""
+    return AnswerModifier(Answer="".join(ChatBotStream(Query)))
+
+class SpeculativeAnswer:
+    """Starts answering a query before it has been classified.
+
+    Tokens are buffered on a background thread and only written to the chat
+    log by commit(). cancel() stops the stream and discards it.
+    """
+
+    def __init__(self, Query):
+        self.query = Query
+        self.cancelled = threading.Event()
+        self.tokens = queue.Queue()
+        self.error = None
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        try:
+            for token in StreamAnswer(self.query, self.cancelled):
+                self.tokens.put(token)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.tokens.put(None)
+
+    def commit(self, Query=None):
+        """Yields the buffered and remaining tokens, then saves the turn.
+
+        Query is what the turn is saved as, normally the general query the
+        classifier extracted, so the chat log matches the non-speculative path.
+        """
+        Answer = ""
+        try:
+            while True:
+                token = self.tokens.get()
+                if token is None:
+                    break
+                Answer += token
+                yield token
+        finally:
+            # Stop generating if the caller stops reading early
+            self.cancelled.set()
+
+        if self.error is not None:
+            print(f"Error: {self.error}")
+            yield "Sorry, an error occurred. Please try again."
+            return
+        SaveTurn(Query or self.query, Answer)
+
+    def cancel(self):
+        """Stops the stream; nothing is written to the chat log."""
+        self.cancelled.set()
 
 if __name__ == "__main__":
     while True:
@@ -0,0 +1,107 @@
+from concurrent.futures import Future
+import threading
+import queue
+
+# Commands that act on an application and must keep their order per application
+AppCommands = ("open ", "close ", "play ")
+
+class Step:
+    """One command in a plan, with the steps it has to wait for."""
+
+    def __init__(self, index, command):
+        self.index = index
+        self.command = command
+        self.depends = []
+        # Set for exit: its dependencies must have been shown, not just started
+        self.after_presented = False
+        self.result = Future()
+        self.presented = Future()
+
+class BufferedStream:
+    """Drains a token iterator on a background thread so it can be read later, in order."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.buffer = queue.Queue()
+        self.closed = threading.Event()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        try:
+            for token in self.tokens:
+                if self.closed.is_set():
+                    break
+                self.buffer.put(token)
+        finally:
+            if hasattr(self.tokens, "close"):
+                self.tokens.close()
+            self.buffer.put(None)
+
+    def __iter__(self):
+        return iter(self.buffer.get, None)
+
+    def close(self):
+        self.closed.set()
+
+def BuildPlan(commands):
+    """Turn FirstLayerDMM's task list into steps with ordering constraints.
+
+    Commands on the same application run in their given order, and exit waits
+    until everything else has been presented. All other steps are independent.
+    """
+    plan = [Step(i, command) for i, command in enumerate(commands)]
+    last_for_app = {}
+    for step in plan:
+        if step.command == "exit":
+            step.depends = [other for other in plan if other is not step]
+            step.after_presented = True
+            continue
+        if step.command.startswith(AppCommands):
+            app = step.command.split(" ", 1)[1].strip().lower()
+            if app in last_for_app:
+                step.depends.append(last_for_app[app])
+            last_for_app[app] = step
+    return plan
+
+def RunPlan(plan, run_command, present, cancel):
+    """Run independent steps in parallel and present their token streams in plan order.
+
+    run_command(command) does the work for one step and may return a token
+    iterator; present(tokens) shows and speaks it. Presentation is serialized
+    so answers are spoken one after another in the order they were asked.
+    """
+    def run(step):
+        try:
+            for dependency in step.depends:
+                done = dependency.presented if step.after_presented else dependency.result
+                done.exception()  # Wait, whatever the outcome
+            if cancel.is_set():
+                step.result.set_result(None)
+                return
+            result = run_command(step.command)
+            if result is not None:
+                result = BufferedStream(result)
+            step.result.set_result(result)
+        except Exception as e:
+            step.result.set_exception(e)
+
+    for step in plan:
+        threading.Thread(target=run, args=(step,), daemon=True).start()
+
+    errors = []
+    # Steps waiting on presentation go last, or they would wait on themselves
+    for step in sorted(plan, key=lambda step: step.after_presented):
+        try:
+            result = step.result.result()
+            if result is None:
+                continue
+            if cancel.is_set():
+                result.close()
+                continue
+            present(result)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            step.presented.set_result(None)
+    if errors:
+        raise errors[0]
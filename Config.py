@@ -0,0 +1,9 @@
+from dotenv import dotenv_values
+import os
+
+# Parse .env once for every backend
+env_vars = dotenv_values(".env")
+
+# Ensure the Data directory exists
+if not os.path.exists("Data"):
+    os.makedirs("Data")
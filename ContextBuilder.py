@@ -0,0 +1,95 @@
+from functools import lru_cache
+import math
+import re
+
+# Context window of llama3-70b-8192
+ContextWindow = 8192
+
+# Tokens kept free to absorb estimation error
+SafetyMargin = 256
+
+# Per-message overhead for role and separator tokens
+MessageOverhead = 4
+
+TokenPattern = re.compile(r"\w+|[^\w\s]")
+
+@lru_cache(maxsize=8192)
+def CountTokens(text):
+    """Estimate the number of tokens in a piece of text.
+
+    Each word or punctuation mark is counted as 1.3 tokens, which errs on the
+    high side for the Llama 3 tokenizer. Results are cached, so every message
+    is only counted once.
+    """
+    return math.ceil(len(TokenPattern.findall(text)) * 1.3)
+
+def MessageTokens(message):
+    """Return the estimated token cost of one chat message."""
+    return CountTokens(message["content"]) + MessageOverhead
+
+def BuildContext(prefix, history, max_tokens, context_window=ContextWindow):
+    """Fit the system prefix and as much recent history as the budget allows.
+
+    History is filled from the newest message backwards, leaving room for
+    max_tokens of completion. The newest message is always kept.
+    """
+    budget = context_window - max_tokens - SafetyMargin
+    budget -= sum(MessageTokens(message) for message in prefix)
+
+    selected = []
+    for message in reversed(history):
+        cost = MessageTokens(message)
+        if selected and cost > budget:
+            break
+        selected.append(message)
+        budget -= cost
+    selected.reverse()
+
+    # Don't start the conversation halfway through a turn
+    while len(selected) > 1 and selected[0]["role"] != "user":
+        selected.pop(0)
+
+    return list(prefix) + selected
+
+class PromptBuilder:
+    """Immutable set of prompt segments for one request.
+
+    The static segment (system prompt and greeting) is built once and shared.
+    Each request derives its own builder with the with_* methods, which
+    return a new builder instead of changing this one, so concurrent requests
+    never see each other's grounding.
+    """
+
+    __slots__ = ("static", "grounding", "summary", "realtime")
+
+    def __init__(self, static=(), grounding=(), summary=(), realtime=()):
+        object.__setattr__(self, "static", tuple(static))
+        object.__setattr__(self, "grounding", tuple(grounding))
+        object.__setattr__(self, "summary", tuple(summary))
+        object.__setattr__(self, "realtime", tuple(realtime))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PromptBuilder is immutable; use the with_* methods")
+
+    def _replace(self, **segments):
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(segments)
+        return PromptBuilder(**fields)
+
+    def with_grounding(self, content):
+        """Add search results or other reference text as a system message."""
+        return self._replace(grounding=self.grounding + ({"role": "system", "content": content},))
+
+    def with_summary(self, messages):
+        return self._replace(summary=messages)
+
+    def with_realtime(self, content):
+        return self._replace(realtime=({"role": "system", "content": content},))
+
+    def prefix(self):
+        """Return fresh copies of the segments, in prompt order."""
+        return [dict(message) for message in self.static + self.grounding + self.summary + self.realtime]
+
+    def build(self, history, max_tokens, context_window=ContextWindow):
+        """Fit the segments and as much recent history as the budget allows."""
+        return BuildContext(self.prefix(), history, max_tokens, context_window)
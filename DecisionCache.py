@@ -0,0 +1,39 @@
+from PersistentCache import PersistentCache, NormalizeQuery
+import os
+
+CachePath = os.path.join("Data", "DecisionCache.json")
+
+# Entries kept before the least recently used ones are evicted
+MaxEntries = 500
+
+# Seconds a decision stays valid, by the category of its tasks
+CategoryTTL = {
+    "realtime": 10 * 60,
+    "reminder": 0,
+    "general": 7 * 24 * 3600,
+    "exit": 30 * 24 * 3600,
+}
+DefaultTTL = 24 * 3600
+
+def DecisionTTL(tasks):
+    """Return the shortest TTL among the categories of a task list."""
+    ttls = []
+    for task in tasks:
+        ttl = DefaultTTL
+        for category, category_ttl in CategoryTTL.items():
+            if task.startswith(category):
+                ttl = category_ttl
+                break
+        ttls.append(ttl)
+    return min(ttls) if ttls else 0
+
+class DecisionCache(PersistentCache):
+    """Persistent LRU cache of FirstLayerDMM decisions keyed on the normalized query."""
+
+    def __init__(self, path=CachePath, max_entries=MaxEntries):
+        super().__init__(path, max_entries)
+
+    def ttl(self, tasks):
+        return DecisionTTL(tasks)
+
+cache = DecisionCache()
@@ -0,0 +1,174 @@
+import threading
+import re
+
+# Minimum confidence for answering without the Cohere model
+ConfidenceThreshold = 0.85
+
+# Verb phrases mapped to the decision they produce
+VerbPhrases = {
+    "open": "open",
+    "launch": "open",
+    "close": "close",
+    "play": "play",
+    "google search": "google search",
+    "search google for": "google search",
+    "search on google for": "google search",
+    "youtube search": "youtube search",
+    "search youtube for": "youtube search",
+    "search on youtube for": "youtube search",
+    "generate image": "generate image",
+    "generate image of": "generate image",
+    "generate an image of": "generate image",
+    "create an image of": "generate image",
+    "system": "system",
+    "content": "content",
+}
+
+# Whole-query phrases that need no argument
+SystemPhrases = {
+    "mute": "mute",
+    "unmute": "unmute",
+    "volume up": "volume up",
+    "volume down": "volume down",
+    "turn the volume up": "volume up",
+    "turn the volume down": "volume down",
+    "increase volume": "volume up",
+    "decrease volume": "volume down",
+}
+
+ExitPhrases = {"exit", "quit", "bye", "bye bye", "goodbye", "good bye", "see you", "see you later"}
+
+# Longest argument accepted for each decision
+MaxArgumentWords = {"open": 3, "close": 3, "system": 3}
+DefaultMaxArgumentWords = 12
+
+# Decisions whose argument must look like an application name
+AppDecisions = {"open", "close"}
+# Decisions whose verb is also an everyday word ("play with me")
+FreeFormDecisions = {"play", "content"}
+
+# Words that mark an argument as conversation rather than a name or a title
+FreeFormWords = {
+    "i", "me", "my", "mine", "you", "your", "yours", "we", "us", "our", "it", "its",
+    "this", "that", "these", "those", "a", "an", "the", "some", "something", "anything",
+    "with", "about", "to", "for", "at", "in", "on", "up", "down", "out", "again",
+}
+
+# Confidence of an unambiguous verb phrase such as "google search" or "open chrome"
+StrongConfidence = 0.95
+# Lost for every argument word past ArgumentWordsWithoutPenalty in a free-form decision
+LengthPenalty = 0.05
+ArgumentWordsWithoutPenalty = 4
+# Lost when the argument reads like conversation
+FreeFormPenalty = 0.3
+
+# Words that turn a command into a question or a compound request
+QuestionWords = {"how", "what", "who", "where", "when", "why", "which", "whose", "whom", "is", "are", "can", "could", "should", "do", "does"}
+CompoundWords = {"and", "then", "also"}
+
+class IntentMatcher:
+    """Rule and trie matcher for commands that don't need the Cohere model."""
+
+    def __init__(self, verb_phrases=VerbPhrases):
+        self.trie = {}
+        for phrase, decision in verb_phrases.items():
+            node = self.trie
+            for word in phrase.split():
+                node = node.setdefault(word, {})
+            node[None] = decision
+
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(prompt):
+        return " ".join(re.sub(r"[^\w\s']", " ", prompt.lower()).split())
+
+    def _longest_prefix(self, words):
+        """Return the decision and length of the longest verb phrase at the start."""
+        node = self.trie
+        match = (None, 0)
+        for i, word in enumerate(words):
+            node = node.get(word)
+            if node is None:
+                break
+            if None in node:
+                match = (node[None], i + 1)
+        return match
+
+    def _match(self, prompt):
+        """Return (decisions, confidence) for a prompt."""
+        text = self.normalize(prompt)
+        if not text or "," in prompt:
+            return None, 0.0
+
+        if text in ExitPhrases:
+            return ["exit"], 1.0
+        if text in SystemPhrases:
+            return [f"system {SystemPhrases[text]}"], 1.0
+
+        words = text.split()
+        if words[0] in QuestionWords or CompoundWords.intersection(words):
+            return None, 0.0
+
+        decision, length = self._longest_prefix(words)
+        argument = words[length:]
+        if decision is None or not argument:
+            return None, 0.0
+        if len(argument) > MaxArgumentWords.get(decision, DefaultMaxArgumentWords):
+            return None, 0.5
+
+        if decision == "system":
+            task = " ".join(argument)
+            if task not in SystemPhrases:
+                return None, 0.5
+            return [f"system {SystemPhrases[task]}"], 1.0
+
+        return [f"{decision} {' '.join(argument)}"], self._confidence(decision, argument)
+
+    @staticmethod
+    def _confidence(decision, argument):
+        """Score how surely a verb phrase and its argument form a command."""
+        free_form = bool(FreeFormWords.intersection(argument))
+        if decision in AppDecisions:
+            # "open chrome" is a command, "close your eyes" isn't
+            return 0.5 if free_form else StrongConfidence
+        if decision in FreeFormDecisions:
+            confidence = StrongConfidence
+            confidence -= LengthPenalty * max(0, len(argument) - ArgumentWordsWithoutPenalty)
+            if free_form:
+                confidence -= FreeFormPenalty
+            return confidence
+        # Explicit phrases like "youtube search" leave little doubt
+        return StrongConfidence
+
+    def classify(self, prompt):
+        """Return the decisions for a prompt, or None if the model is needed."""
+        decisions, confidence = self._match(prompt)
+        with self.lock:
+            if decisions and confidence >= ConfidenceThreshold:
+                self.hits += 1
+                return decisions
+            self.misses += 1
+            return None
+
+    def stats(self):
+        """Return hit and miss counts and the hit rate."""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+matcher = IntentMatcher()
+
+def ClassifyLocally(prompt):
+    """Classify a prompt locally, returning None when confidence is low."""
+    return matcher.classify(prompt)
+
+def FastPathStats():
+    """Return hit and miss rates of the local classifier."""
+    return matcher.stats()
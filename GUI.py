@@ -1,21 +1,50 @@
+import StartupProfile
+if StartupProfile.Enabled:
+    StartupProfile.Start()
+
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 import os
 import sys
 from PIL import Image, ImageTk
-import asyncio
+import logging
+import queue
+import threading
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from Config import env_vars
+from Services import Lazy, registry
+from Runtime import RunSync
+from CommandScheduler import BuildPlan, RunPlan
+from Thumbnails import SubmitThumbnail, SubmitOriginal
+
+logger = logging.getLogger(__name__)
 
 # Add Backend directory to system path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Backend')))
 
-# Import backend functionalities (assuming these exist)
-from SpeechToText import SpeechRecognition
-from TextToSpeech import TextToSpeech
-from Chatbot import ChatBot
-from ImageGeneration import GenerateImages
-from RealtimeSearchEngine import RealtimeSearchEngine
-from Automation import Automation
-from Model import FirstLayerDMM
+# Backend functionalities, imported on first use so the window doesn't wait for them
+SpeechRecognition = Lazy("SpeechToText", "SpeechRecognition")
+WarmUpRecognizer = Lazy("SpeechToText", "WarmUpRecognizer")
+TextToSpeechStream = Lazy("TextToSpeech", "TextToSpeechStream")
+StopSpeaking = Lazy("TextToSpeech", "StopSpeaking")
+WarmSpeechCache = Lazy("TextToSpeech", "WarmSpeechCache")
+ChatBotStream = Lazy("Chatbot", "ChatBotStream")
+SpeculativeAnswer = Lazy("Chatbot", "SpeculativeAnswer")
+GenerateImagesStream = Lazy("ImageGeneration", "GenerateImagesStream")
+RealtimeSearchEngineStream = Lazy("RealtimeSearchEngine", "RealtimeSearchEngineStream")
+Automation = Lazy("Automation", "Automation")
+QuickDecision = Lazy("Model", "QuickDecision")
+CohereDecision = Lazy("Model", "CohereDecision")
+
+# Loaded in the background once the window is up
+Backends = ["Model", "Chatbot", "RealtimeSearchEngine", "TextToSpeech", "Automation", "ImageGeneration", "SpeechToText"]
+
+# Number of images shown per generation
+GallerySlots = 4
+
+# Start answering general questions while the query is still being classified
+SpeculativeMode = str(env_vars.get("SpeculativeMode", "False")).lower() == "true"
 
 class JarvisGUI:
     def __init__(self, root):
@@ -54,8 +83,14 @@ class JarvisGUI:
         # Image Display Area with placeholder background
         self.image_frame = ttk.Frame(self.main_frame, style="Main.TFrame")
         self.image_frame.pack(pady=10)
-        self.image_label = ttk.Label(self.image_frame, background="#2a2d35", compound="center")
-        self.image_label.pack()
+        # 2x2 gallery of generated images; thumbnails are filled in as they are decoded
+        self.gallery = []
+        for i in range(GallerySlots):
+            tile = ttk.Label(self.image_frame, background="#2a2d35", compound="center", cursor="hand2")
+            tile.grid(row=i // 2, column=i % 2, padx=2, pady=2)
+            self.gallery.append(tile)
+        self.gallery_generations = itertools.count(1)
+        self.gallery_generation = 0
 
         # Input Frame
         self.input_frame = ttk.Frame(self.main_frame, style="Main.TFrame")
@@ -109,6 +144,12 @@ class JarvisGUI:
             self.image_button = ttk.Button(self.action_frame, text="Generate Image", command=self.generate_image_action)
         self.image_button.grid(row=0, column=1, padx=10)
 
+        # Cancel button and progress indicator for background work
+        self.cancel_button = ttk.Button(self.action_frame, text="Cancel", command=self.cancel_tasks, state="disabled")
+        self.cancel_button.grid(row=0, column=2, padx=10)
+        self.progress = ttk.Progressbar(self.action_frame, mode="indeterminate", length=300)
+        self.progress.grid(row=1, column=0, columnspan=3, pady=(10, 0))
+
         # Status Bar with gradient
         self.status_canvas = tk.Canvas(self.root, height=30, bg="#0d1b2a", highlightthickness=0)
         self.status_canvas.pack(fill="x", side="bottom")
@@ -117,6 +158,30 @@ class JarvisGUI:
         self.status_bar = ttk.Label(self.status_canvas, textvariable=self.status_var, style="TLabel")
         self.status_bar.place(relx=0.5, rely=0.5, anchor="center")
 
+        # Text and UI callbacks produced by worker threads, handled on the Tk main loop
+        self.output_queue = queue.Queue()
+        self.answer_ids = itertools.count(1)
+        self.answer_marks = set()
+        self.ui_queue = queue.Queue()
+        self.speech_lock = threading.Lock()
+        self.root.after(50, self.drain_output)
+
+        # Network calls, TTS and image generation run here instead of on the Tk thread
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="jarvis")
+        self.active_tasks = {}  # cancel event -> status label
+
+        # Load the backends once the window is up, then warm them
+        self.root.after(500, lambda: registry.preload(Backends, on_done=self.warm_up_backends))
+
+    def warm_up_backends(self):
+        """Pre-render canned phrases and start headless Chrome; runs on the preload thread."""
+        WarmSpeechCache()
+        WarmUpRecognizer()
+        if StartupProfile.Enabled:
+            StartupProfile.Report("Backends ready")
+            for name, seconds in registry.timings.items():
+                print(f"  {seconds * 1000:8.1f} ms  build {name}")
+
     def create_gradient(self, canvas, color1, color2):
         """Create a gradient background on a canvas."""
         width = self.root.winfo_screenwidth()
@@ -135,26 +200,182 @@ class JarvisGUI:
             canvas.create_line(0, i, width, i, fill=color)
 
     def update_output(self, message):
-        self.output_area.config(state='normal')
-        self.output_area.insert(tk.END, message + "\n")
-        self.output_area.config(state='disabled')
-        self.output_area.see(tk.END)
+        self.output_queue.put(message + "\n")
+
+    def call_in_ui(self, func, *args):
+        """Run func on the Tk main loop; safe to call from any thread."""
+        self.ui_queue.put((func, args))
+
+    def drain_output(self):
+        """Render text and run callbacks queued by any thread; runs on the Tk main loop."""
+        items = []
+        try:
+            while True:
+                items.append(self.output_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if items:
+            self.output_area.config(state='normal')
+            for item in items:
+                self.write_output(item)
+            self.output_area.config(state='disabled')
+            self.output_area.see(tk.END)
+
+        try:
+            while True:
+                func, args = self.ui_queue.get_nowait()
+                try:
+                    func(*args)
+                except Exception:
+                    # One failing callback must not stop the UI from updating
+                    logger.exception(f"UI callback {getattr(func, '__name__', func)} failed")
+        except queue.Empty:
+            pass
+        self.root.after(50, self.drain_output)
+
+    def write_output(self, item):
+        """Insert one queued output item into the text area.
 
-    def display_image(self, image_paths):
-        if not image_paths:
-            self.update_output("Jarvis: No images available to display.")
+        Plain strings are appended. (mark, text) items belong to a streaming
+        answer and are inserted in that answer's own region, so answers
+        streaming at the same time never interleave; text None closes it.
+        """
+        if isinstance(item, str):
+            self.output_area.insert(tk.END, item)
             return
-        for image_path in image_paths:
+        mark, text = item
+        if text is None:
+            self.output_area.mark_unset(mark)
+            self.answer_marks.discard(mark)
+            return
+        if mark not in self.answer_marks:
+            # Open the region as a line of its own; the mark sits before its newline
+            self.output_area.insert(tk.END, "\n")
+            self.output_area.mark_set(mark, "end-2c")
+            self.answer_marks.add(mark)
+        self.output_area.insert(mark, text)
+
+    def run_task(self, status, func, *args):
+        """Run a pipeline on the worker pool with progress and cancel support.
+
+        func receives a threading.Event as its last argument, which is set
+        when the user presses Cancel.
+        """
+        cancel = threading.Event()
+        self.active_tasks[cancel] = status
+        self.refresh_progress()
+
+        def done(future):
+            error = future.exception()
+            if error is not None:
+                self.update_output(f"Jarvis: Error: {error}")
+            self.call_in_ui(self.finish_task, cancel)
+
+        self.executor.submit(func, *args, cancel).add_done_callback(done)
+
+    def finish_task(self, cancel):
+        self.active_tasks.pop(cancel, None)
+        self.refresh_progress()
+
+    def refresh_progress(self):
+        """Show the newest task's status, or Ready when nothing is running."""
+        if self.active_tasks:
+            self.status_var.set(list(self.active_tasks.values())[-1])
+            self.cancel_button.config(state="normal")
+            self.progress.start(10)
+        else:
+            self.status_var.set("Ready")
+            self.cancel_button.config(state="disabled")
+            self.progress.stop()
+
+    def cancel_tasks(self):
+        for cancel in self.active_tasks:
+            cancel.set()
+        StopSpeaking()
+        self.update_output("Jarvis: Cancelled.")
+
+    def set_status(self, status):
+        """Update the status bar from a worker thread."""
+        self.call_in_ui(self.status_var.set, status)
+
+    def stream_response(self, tokens, cancel):
+        """Render an answer token by token and speak it sentence by sentence as it arrives."""
+        speech_queue = queue.Queue()
+
+        def speak():
+            with self.speech_lock:
+                TextToSpeechStream(iter(speech_queue.get, None), lambda: not cancel.is_set())
+
+        speaker = threading.Thread(target=speak, daemon=True)
+        speaker.start()
+
+        # Tokens go to this answer's own region of the output area
+        mark = f"answer{next(self.answer_ids)}"
+        self.output_queue.put((mark, "Jarvis: "))
+        try:
+            for token in tokens:
+                if cancel.is_set():
+                    break
+                self.output_queue.put((mark, token))
+                speech_queue.put(token)
+        finally:
+            # Closing the stream stops generation and keeps a cancelled answer out of the chat log
+            if hasattr(tokens, "close"):
+                tokens.close()
+            self.output_queue.put((mark, None))
+            speech_queue.put(None)
+
+        # Keep the task active until the answer has been spoken
+        speaker.join()
+
+    def clear_gallery(self, generation):
+        """Empty the gallery for a new generation; tiles of older ones are dropped from now on."""
+        self.gallery_generation = generation
+        for tile in self.gallery:
+            tile.configure(image="")
+            tile.image = None
+            tile.unbind("<Button-1>")
+
+    def add_gallery_image(self, generation, slot, image_path):
+        """Thumbnail an image off the Tk thread, then show it in a gallery tile."""
+        def done(future):
             try:
-                img = Image.open(image_path)
-                img = img.resize((250, 250), Image.Resampling.LANCZOS)
-                photo = ImageTk.PhotoImage(img)
-                self.image_label.configure(image=photo)
-                self.image_label.image = photo
-                self.root.update()
-                break
-            except IOError as e:
+                thumbnail = future.result()
+            except Exception as e:
                 self.update_output(f"Jarvis: Unable to display {image_path}: {str(e)}")
+                return
+            self.call_in_ui(self.show_thumbnail, generation, slot, image_path, thumbnail)
+
+        SubmitThumbnail(image_path).add_done_callback(done)
+
+    def show_thumbnail(self, generation, slot, image_path, thumbnail):
+        if generation != self.gallery_generation:
+            return  # Late thumbnail from an earlier generation
+        tile = self.gallery[slot]
+        photo = ImageTk.PhotoImage(thumbnail)
+        tile.configure(image=photo)
+        tile.image = photo  # Keep reference
+        tile.bind("<Button-1>", lambda event: self.open_original(image_path))
+
+    def open_original(self, image_path):
+        """Decode the full-size image only when its thumbnail is clicked."""
+        def done(future):
+            try:
+                img = future.result()
+            except Exception as e:
+                self.update_output(f"Jarvis: Unable to open {image_path}: {str(e)}")
+                return
+            self.call_in_ui(self.show_original, image_path, img)
+
+        SubmitOriginal(image_path).add_done_callback(done)
+
+    def show_original(self, image_path, img):
+        window = tk.Toplevel(self.root, bg="#0d1b2a")
+        window.title(os.path.basename(image_path))
+        photo = ImageTk.PhotoImage(img)
+        label = ttk.Label(window, image=photo, background="#0d1b2a")
+        label.image = photo
+        label.pack()
 
     def process_text_input(self, event=None):
         user_input = self.input_field.get().strip()
@@ -162,55 +383,77 @@ class JarvisGUI:
             return
         self.update_output(f"User: {user_input}")
         self.input_field.delete(0, tk.END)
-        self.status_var.set("Processing...")
-        commands = FirstLayerDMM(user_input)
+        self.run_task("Processing...", self.handle_query, user_input)
+
+    def handle_query(self, user_input, cancel):
+        """Classify a query and run its commands; runs on a worker thread."""
+        speculative = None
+        commands = QuickDecision(user_input)
+        if commands is None:
+            # Only the Cohere round trip leaves time worth answering into
+            if SpeculativeMode:
+                speculative = SpeculativeAnswer(user_input)
+            commands = CohereDecision(user_input)
         self.update_output(f"Jarvis: Classified as {commands}")
-        for command in commands:
-            if command.startswith("general"):
-                query = command.replace("general ", "")
-                response = ChatBot(query)
-                self.update_output(f"Jarvis: {response}")
-                TextToSpeech(response)
-            elif command.startswith(("open", "close", "play", "content", "google search", "youtube search", "system")):
-                if command.startswith("google search") and "www.google.com" in command:
-                    self.update_output("Jarvis: It looks like you entered a URL. Please provide a search term.")
-                    continue
-                if command.startswith("google search weather today"):
-                    weather_response = RealtimeSearchEngine("weather today in Ashburn")
-                    self.update_output(f"Jarvis: {weather_response}")
-                    TextToSpeech(weather_response)
-                    continue
-                result = asyncio.run(Automation([command]))
-                self.update_output(f"Jarvis: Automation result: {', '.join(result)}")
-            elif command.startswith("generate image"):
-                prompt = command.replace("generate image ", "")
-                self.generate_image_action(prompt)
-            elif command.startswith("realtime"):
-                query = command.replace("realtime ", "")
-                response = RealtimeSearchEngine(query)
-                self.update_output(f"Jarvis: {response}")
-                TextToSpeech(response)
-            elif command == "exit":
-                self.update_output("Jarvis: Goodbye!")
-                self.root.quit()
-            else:
-                self.update_output(f"Jarvis: Unrecognized command: {command}")
-        self.status_var.set("Ready")
+        # Keep the speculative answer only if the query turned out to be a single general question
+        if speculative and (cancel.is_set() or not (len(commands) == 1 and commands[0].startswith("general"))):
+            speculative.cancel()
+            speculative = None
+
+        # Independent commands run in parallel; answers are shown and spoken in order
+        RunPlan(
+            BuildPlan(commands),
+            lambda command: self.run_command(command, cancel, speculative),
+            lambda tokens: self.stream_response(tokens, cancel),
+            cancel
+        )
+
+    def run_command(self, command, cancel, speculative=None):
+        """Run one command; returns a token stream for commands that answer out loud."""
+        if command.startswith("general"):
+            query = command.replace("general ", "")
+            return speculative.commit(query) if speculative else ChatBotStream(query)
+        elif command.startswith(("open", "close", "play", "content", "google search", "youtube search", "system")):
+            if command.startswith("google search") and "www.google.com" in command:
+                self.update_output("Jarvis: It looks like you entered a URL. Please provide a search term.")
+                return None
+            if command.startswith("google search weather today"):
+                return RealtimeSearchEngineStream("weather today in Ashburn")
+            result = RunSync(Automation([command]))
+            self.update_output(f"Jarvis: Automation result: {', '.join(str(r) for r in result)}")
+        elif command.startswith("generate image"):
+            prompt = command.replace("generate image ", "")
+            self.create_images(prompt, cancel)
+        elif command.startswith("realtime"):
+            query = command.replace("realtime ", "")
+            return RealtimeSearchEngineStream(query)
+        elif command == "exit":
+            self.update_output("Jarvis: Goodbye!")
+            self.call_in_ui(self.root.quit)
+        else:
+            self.update_output(f"Jarvis: Unrecognized command: {command}")
+        return None
 
     def process_voice_input(self):
-        self.status_var.set("Listening...")
+        # Barge in: stop talking as soon as the user starts speaking
+        StopSpeaking()
+        self.run_task("Listening...", self.handle_voice)
+
+    def handle_voice(self, cancel):
+        """Recognize speech and handle it as a query; runs on a worker thread."""
         try:
             user_input = SpeechRecognition()
-            if user_input:
-                self.update_output(f"User (Voice): {user_input}")
-                self.input_field.delete(0, tk.END)
-                self.input_field.insert(0, user_input)
-                self.process_text_input()
-            else:
-                self.update_output("Jarvis: I didn't catch that. Please try again.")
         except Exception as e:
             self.update_output(f"Jarvis: Error with voice input: {str(e)}")
-        self.status_var.set("Ready")
+            return
+        if cancel.is_set():
+            return
+        if not user_input:
+            self.update_output("Jarvis: I didn't catch that. Please try again.")
+            return
+        self.update_output(f"User (Voice): {user_input}")
+        self.set_status("Processing...")
+        self.handle_query(user_input, cancel)
 
     def perform_search(self):
         user_input = self.input_field.get().strip()
@@ -218,15 +461,15 @@ class JarvisGUI:
             self.update_output("Jarvis: Please enter a search query.")
             return
         self.update_output(f"User: Search for {user_input}")
-        self.status_var.set("Searching...")
-        result = RealtimeSearchEngine(user_input)
-        self.update_output(f"Jarvis: {result}")
-        TextToSpeech(result)
-        self.status_var.set("Ready")
+        self.run_task("Searching...", lambda cancel: self.stream_response(RealtimeSearchEngineStream(user_input), cancel))
 
     def generate_image_action(self, prompt=None):
         if not prompt:
             prompt = self.input_field.get().strip()
+        self.run_task("Generating Image...", self.create_images, prompt)
+
+    def create_images(self, prompt, cancel):
+        """Generate images for a prompt and show them; runs on a worker thread."""
         if not prompt or prompt == "(image prompt)":
             self.update_output("Jarvis: Please enter a valid description for the image.")
             return
@@ -234,16 +477,33 @@ class JarvisGUI:
             self.update_output("Jarvis: Adjusting prompt to avoid copyrighted content.")
             prompt = "A superhero in a red and gold suit"
         self.update_output(f"User: Generate image of {prompt}")
-        self.status_var.set("Generating Image...")
-        success, image_paths, error_msg = GenerateImages(prompt)
-        if success:
+        self.set_status("Generating Image...")
+        generation = next(self.gallery_generations)
+        self.call_in_ui(self.clear_gallery, generation)
+        # Each image is shown as soon as it is saved instead of after the slowest one
+        errors = []
+        images = GenerateImagesStream(prompt, errors)
+        count = 0
+        try:
+            for image_path in images:
+                if cancel.is_set():
+                    return
+                if count < GallerySlots:
+                    self.call_in_ui(self.add_gallery_image, generation, count, image_path)
+                count += 1
+        finally:
+            images.close()
+        if count:
             self.update_output(f"Jarvis: Image generated for '{prompt}'!")
-            self.display_image(image_paths)
         else:
-            self.update_output(f"Jarvis: {error_msg}")
-        self.status_var.set("Ready")
+            error_msg = "; ".join(errors) if errors else "No images were returned"
+            self.update_output(f"Jarvis: Failed to generate images: {error_msg}")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     root = tk.Tk()
     app = JarvisGUI(root)
-    root.mainloop()
\ No newline at end of file
+    if StartupProfile.Enabled:
+        root.after_idle(StartupProfile.Report)
+    root.mainloop()
+    app.executor.shutdown(wait=False, cancel_futures=True)
\ No newline at end of file
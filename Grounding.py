@@ -0,0 +1,94 @@
+from ContextBuilder import CountTokens
+import math
+import re
+
+# Tokens of search results given to the model
+GroundingTokens = 700
+
+# Results kept at most, however many fit in the budget
+TopK = 5
+
+# Results sharing this fraction of their word shingles count as duplicates
+DuplicateThreshold = 0.6
+
+# Words per shingle
+ShingleSize = 3
+
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+
+WordPattern = re.compile(r"\w+")
+
+def Words(text):
+    return WordPattern.findall(text.lower())
+
+def ResultText(result):
+    return " ".join(filter(None, (result["title"], result["description"], result.get("content", ""))))
+
+def Shingles(words, size=ShingleSize):
+    """Return the set of word n-grams of a text; short texts are a single shingle."""
+    if len(words) < size:
+        return {tuple(words)}
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def Jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def BM25Scores(query_words, documents):
+    """Score tokenized documents against a query with Okapi BM25."""
+    count = len(documents)
+    if not count:
+        return []
+    average_length = sum(len(document) for document in documents) / count or 1
+    document_frequency = {}
+    for document in documents:
+        for word in set(document):
+            document_frequency[word] = document_frequency.get(word, 0) + 1
+
+    scores = []
+    for document in documents:
+        frequencies = {}
+        for word in document:
+            frequencies[word] = frequencies.get(word, 0) + 1
+        score = 0.0
+        for word in set(query_words):
+            frequency = frequencies.get(word)
+            if not frequency:
+                continue
+            idf = math.log(1 + (count - document_frequency[word] + 0.5) / (document_frequency[word] + 0.5))
+            score += idf * frequency * (K1 + 1) / (frequency + K1 * (1 - B + B * len(document) / average_length))
+        scores.append(score)
+    return scores
+
+def SelectResults(query, results, max_tokens=GroundingTokens, top_k=TopK):
+    """Rank search results against the query, drop near-duplicates and fit the rest in a token budget.
+
+    Results are returned best first. The best result is always kept, even if
+    it is over budget on its own or shares no words with the query.
+    """
+    documents = [Words(ResultText(result)) for result in results]
+    scores = BM25Scores(Words(query), documents)
+    # Stable sort, so ties keep the search engine's own order
+    ranked = sorted(range(len(results)), key=lambda i: -scores[i])
+
+    selected = []
+    kept_shingles = []
+    budget = max_tokens
+    for i in ranked:
+        if len(selected) >= top_k:
+            break
+        if selected and scores[i] <= 0:
+            break  # Nothing left that mentions the query
+        shingles = Shingles(documents[i])
+        if any(Jaccard(shingles, kept) >= DuplicateThreshold for kept in kept_shingles):
+            continue
+        cost = CountTokens(ResultText(results[i]))
+        if selected and cost > budget:
+            continue
+        selected.append(results[i])
+        kept_shingles.append(shingles)
+        budget -= cost
+    return selected
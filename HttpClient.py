@@ -0,0 +1,23 @@
+import aiohttp
+
+# Connection pool limits shared by every async HTTP caller
+MaxConnections = 20
+MaxConnectionsPerHost = 8
+
+Session = None
+
+async def GetSession():
+    """Return the pooled aiohttp session, creating it on the calling loop.
+
+    Callers submit their coroutines through Runtime, so the session lives on
+    the shared loop and keeps connections alive across requests.
+    """
+    global Session
+    if Session is None or Session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=MaxConnections,
+            limit_per_host=MaxConnectionsPerHost,
+            ttl_dns_cache=300
+        )
+        Session = aiohttp.ClientSession(connector=connector)
+    return Session
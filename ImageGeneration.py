@@ -1,117 +1,200 @@
 import asyncio
 from random import randint
 from PIL import Image
-import requests
-from dotenv import get_key
+import aiohttp
+from Config import env_vars
+from Runtime import RunSync, Iterate
+from HttpClient import GetSession
+from RateLimiter import AdaptiveRateLimiter, ParseRetryAfter
+from ImageStore import store, ImageKey
 import os
 import time
 import logging
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Set up logging (handlers are configured by the entry point)
 logger = logging.getLogger(__name__)
 
-# Function to open generated images (return paths for GUI)
-def open_image(prompt):
-    folder_path = "Data"
-    prompt = prompt.replace(" ", "_")
-    files = [f"{prompt}{i}.jpg" for i in range(1, 5)]
-    image_paths = []
-
-    for jpg_file in files:
-        image_path = os.path.join(folder_path, jpg_file)
-        if os.path.exists(image_path):
-            image_paths.append(image_path)
-            logger.info(f"Found image: {image_path}")
-        else:
-            logger.warning(f"Image not found: {image_path}")
-
-    return image_paths
-
 # Hugging Face API configuration
 API_URL = "https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-xl-base-1.0"
-huggingface_api_key = get_key('.env', 'HuggingFaceAPIKey')
-if not huggingface_api_key:
-    logger.error("HuggingFaceAPIKey not found in .env file.")
-    raise ValueError("HuggingFaceAPIKey not found in .env file.")
-headers = {"Authorization": f"Bearer {huggingface_api_key}"}
-
-# Asynchronous function to query the Hugging Face API with retry on rate limits
-async def query(payload, retries=3, backoff=5):
+
+# Everything besides the prompt that decides what gets generated; part of the cache key
+ImageCount = 4
+PromptSuffix = "quality=4k, sharpness=maximum, Ultra High details, high resolution"
+ImageParams = {"model": API_URL, "count": ImageCount, "suffix": PromptSuffix}
+
+def HuggingFaceHeaders():
+    """Return the API headers, failing on first use rather than at import."""
+    huggingface_api_key = env_vars.get('HuggingFaceAPIKey')
+    if not huggingface_api_key:
+        logger.error("HuggingFaceAPIKey not found in .env file.")
+        raise ValueError("HuggingFaceAPIKey not found in .env file.")
+    return {"Authorization": f"Bearer {huggingface_api_key}"}
+
+# Concurrent Hugging Face requests and per-request timeout in seconds
+MaxConcurrentRequests = int(env_vars.get("HuggingFaceConcurrency") or 4)
+RequestTimeout = float(env_vars.get("HuggingFaceTimeout") or 120)
+
+# Shared by every generation so parallel requests back off together
+limiter = AdaptiveRateLimiter(rate=1.0, burst=MaxConcurrentRequests, max_concurrency=MaxConcurrentRequests)
+
+# Asynchronous function to query the Hugging Face API with retry on rate limits.
+# Always returns (image bytes, None) on success or (None, error message) on failure.
+async def query(payload, retries=4):
+    try:
+        headers = HuggingFaceHeaders()
+    except ValueError as e:
+        return None, str(e)
+    session = await GetSession()
+    timeout = aiohttp.ClientTimeout(total=RequestTimeout)
     for attempt in range(retries):
+        await limiter.acquire()
+        status, retry_after = 599, None
         try:
             logger.info(f"Sending request to Hugging Face API with payload: {payload}")
-            response = await asyncio.to_thread(requests.post, API_URL, headers=headers, json=payload)
-            response.raise_for_status()
-            logger.info(f"API request successful, received {len(response.content)} bytes.")
-            return response.content
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 429:  # Rate limit exceeded
-                logger.warning(f"Rate limit exceeded, retrying in {backoff} seconds (attempt {attempt + 1}/{retries})")
-                await asyncio.sleep(backoff)
-                backoff *= 2  # Exponential backoff
-                continue
-            logger.error(f"API request failed: {e}")
-            if e.response:
-                logger.error(f"Status Code: {e.response.status_code}")
-                logger.error(f"Response Text: {e.response.text}")
-            return None, str(e)
-        except requests.exceptions.RequestException as e:
+            async with session.post(API_URL, headers=headers, json=payload, timeout=timeout) as response:
+                status = response.status
+                if status == 429:
+                    retry_after = ParseRetryAfter(response.headers.get("Retry-After"))
+                elif status >= 400:
+                    logger.error(f"API request failed: {status} {response.reason}")
+                    logger.error(f"Response Text: {await response.text()}")
+                    return None, f"{status} {response.reason}"
+                else:
+                    content = await response.read()
+                    logger.info(f"API request successful, received {len(content)} bytes.")
+                    return content, None
+        except asyncio.TimeoutError:
+            logger.error(f"API request timed out after {RequestTimeout} seconds.")
+            return None, f"Request timed out after {RequestTimeout} seconds."
+        except aiohttp.ClientError as e:
             logger.error(f"API request failed: {e}")
             return None, str(e)
+        finally:
+            await limiter.release(status, retry_after)
+
+        # Rate limit exceeded; the limiter has already slowed every caller down
+        delay = limiter.backoff(attempt, retry_after)
+        logger.warning(f"Rate limit exceeded, retrying in {delay:.1f} seconds (attempt {attempt + 1}/{retries}, {limiter.stats()})")
+        await asyncio.sleep(delay)
     logger.error("Max retries reached for API request.")
     return None, "Max retries reached due to rate limit."
 
-# Asynchronous function to generate images
-async def generate_images(prompt: str):
-    tasks = []
-    errors = []
-
-    for _ in range(4):
+class ImageJob:
+    """One running generation; any number of callers can follow its images as they land."""
+
+    def __init__(self):
+        self.paths = []
+        self.errors = []
+        self.done = False
+        self.task = None
+        self.changed = asyncio.Condition()
+
+    async def add(self, image_path):
+        async with self.changed:
+            self.paths.append(image_path)
+            self.changed.notify_all()
+
+    async def finish(self):
+        async with self.changed:
+            self.done = True
+            self.changed.notify_all()
+
+    async def follow(self):
+        seen = 0
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: self.done or len(self.paths) > seen)
+                new_paths = self.paths[seen:]
+                done = self.done
+            if not new_paths and done:
+                return
+            for image_path in new_paths:
+                yield image_path
+            seen += len(new_paths)
+
+# Generations currently running, so concurrent identical prompts share one
+InFlight = {}
+
+# Asynchronous iterator over generated image paths, in the order the images finish
+async def stream_images(prompt: str, errors=None):
+    key = ImageKey(prompt, ImageParams)
+
+    cached = await asyncio.to_thread(store.lookup, key)
+    if cached:
+        logger.info(f"Serving {len(cached)} cached images for prompt: {prompt}")
+        for image_path in cached:
+            yield image_path
+        return
+
+    job = InFlight.get(key)
+    if job:
+        logger.info(f"Joining in-flight generation for prompt: {prompt}")
+    else:
+        job = ImageJob()
+        InFlight[key] = job
+        # The generation runs as its own task, so a caller that stops
+        # listening early doesn't cut it short for the others or the cache
+        job.task = asyncio.create_task(_generate_images(prompt, key, job))
+
+    async for image_path in job.follow():
+        yield image_path
+    if errors is not None:
+        errors.extend(job.errors)
+
+async def _generate_images(prompt, key, job):
+    sizes = {}
+
+    async def generate_one(i):
         payload = {
-            "inputs": f"{prompt}, quality=4k, sharpness=maximum, Ultra High details, high resolution, seed={randint(0, 1000000)}",
+            "inputs": f"{prompt}, {PromptSuffix}, seed={randint(0, 1000000)}",
         }
-        task = asyncio.create_task(query(payload))
-        tasks.append(task)
-
-    results = await asyncio.gather(*tasks)
+        image_bytes, error = await query(payload)
+        if not image_bytes:
+            logger.warning(f"Image {i + 1} failed to generate (no bytes received).")
+            job.errors.append(f"Image {i + 1} failed: {error}")
+            return
+        name = f"{i + 1}.jpg"
+        try:
+            # File writes go to a worker thread so they never block the loop
+            image_path = await asyncio.to_thread(store.write_image, key, name, image_bytes)
+        except Exception as e:
+            logger.error(f"Failed to save image {i + 1}: {e}")
+            job.errors.append(f"Failed to save image {i + 1}: {str(e)}")
+            return
+        logger.info(f"Successfully saved image: {image_path}")
+        sizes[name] = len(image_bytes)
+        await job.add(image_path)
 
-    # Ensure the Data directory exists
     try:
-        os.makedirs("Data", exist_ok=True)
+        await asyncio.gather(*(generate_one(i) for i in range(ImageCount)))
+        # Index only complete sets; a partial one would be served as a cache hit
+        # until evicted, so the next request for the prompt regenerates instead
+        if len(sizes) == ImageCount:
+            files = [os.path.basename(image_path) for image_path in job.paths]
+            await asyncio.to_thread(store.commit, key, prompt, ImageParams, files, sum(sizes.values()))
+        logger.info(f"Generated {len(job.paths)} images successfully.")
     except Exception as e:
-        logger.error(f"Failed to create Data directory: {e}")
-        return False, str(e)
-
-    # Count the number of successfully generated images
-    success_count = 0
-    prompt_cleaned = prompt.replace(" ", "_")
-
-    for i, result in enumerate(results):
-        image_bytes, error = result
-        if image_bytes:
-            image_path = os.path.join("Data", f"{prompt_cleaned}{i + 1}.jpg")
-            try:
-                with open(image_path, "wb") as f:
-                    f.write(image_bytes)
-                logger.info(f"Successfully saved image: {image_path}")
-                success_count += 1
-            except Exception as e:
-                logger.error(f"Failed to save image {image_path}: {e}")
-                errors.append(f"Failed to save image {i + 1}: {str(e)}")
-        else:
-            logger.warning(f"Image {i + 1} failed to generate (no bytes received).")
-            errors.append(f"Image {i + 1} failed: {error}")
+        logger.error(f"Image generation failed: {e}")
+        job.errors.append(str(e))
+    finally:
+        del InFlight[key]
+        await job.finish()
+
+# Asynchronous function to generate images; returns (success, image paths, error message)
+async def generate_images(prompt: str):
+    errors = []
+    image_paths = [image_path async for image_path in stream_images(prompt, errors)]
+    return len(image_paths) > 0, image_paths, "; ".join(errors) if errors else "No errors"
 
-    logger.info(f"Generated {success_count} images successfully.")
-    return success_count > 0, "; ".join(errors) if errors else "No errors"
+# Function to stream image paths to sync callers as each image is saved
+def GenerateImagesStream(prompt: str, errors=None):
+    return Iterate(stream_images(prompt, errors))
 
 # Function to generate images (return success status, paths, and error message)
 def GenerateImages(prompt: str):
     try:
-        success, error_msg = asyncio.run(generate_images(prompt))
+        success, image_paths, error_msg = RunSync(generate_images(prompt))
         if success:
-            image_paths = open_image(prompt)
             return True, image_paths, "Images generated successfully."
         else:
             return False, [], f"Failed to generate images: {error_msg}"
@@ -145,6 +228,7 @@ def main():
             break
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     prompt = "A futuristic city"
     success, paths, error_msg = GenerateImages(prompt)
     print(f"Success: {success}, Paths: {paths}, Error: {error_msg}")
\ No newline at end of file
@@ -0,0 +1,98 @@
+from json import load, dump, dumps
+import threading
+import hashlib
+import shutil
+import time
+import os
+
+StorePath = os.path.join("Data", "Images")
+IndexPath = os.path.join(StorePath, "index.json")
+
+# Disk quota for generated images; least recently used prompts are evicted first
+MaxStoreBytes = 500 * 1024 * 1024
+
+def NormalizePrompt(prompt):
+    """Lowercase a prompt and collapse whitespace."""
+    return " ".join(prompt.lower().split())
+
+def ImageKey(prompt, params):
+    """Hash of the normalized prompt and the generation parameters."""
+    data = dumps({"prompt": NormalizePrompt(prompt), "params": params}, sort_keys=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+class ImageStore:
+    """Content-addressed store of generated images with an LRU disk quota.
+
+    Each key gets its own folder, and index.json records the prompt, the
+    parameters, the file names, their total size and when they were last used.
+    """
+
+    def __init__(self, path=StorePath, index_path=IndexPath, max_bytes=MaxStoreBytes):
+        self.path = path
+        self.index_path = index_path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.index = load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def _save_index(self):
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            dump(self.index, f, indent=4)
+        os.replace(temp_path, self.index_path)
+
+    def lookup(self, key):
+        """Return the image paths stored for a key, or [] on a miss."""
+        with self.lock:
+            entry = self.index.get(key)
+            if not entry:
+                return []
+            paths = [os.path.join(self.path, key, name) for name in entry["files"]]
+            if not all(os.path.exists(path) for path in paths):
+                del self.index[key]
+                self._save_index()
+                return []
+            entry["used"] = time.time()
+            self._save_index()
+            return paths
+
+    def write_image(self, key, name, image_bytes):
+        """Write one image under a key and return its path; it is not indexed until commit()."""
+        folder = os.path.join(self.path, key)
+        os.makedirs(folder, exist_ok=True)
+        image_path = os.path.join(folder, name)
+        with open(image_path, "wb") as f:
+            f.write(image_bytes)
+        return image_path
+
+    def commit(self, key, prompt, params, files, size):
+        """Index the images written for a key and enforce the disk quota."""
+        with self.lock:
+            now = time.time()
+            self.index[key] = {
+                "prompt": prompt,
+                "params": params,
+                "files": files,
+                "bytes": size,
+                "created": now,
+                "used": now,
+            }
+            self._evict(keep=key)
+            self._save_index()
+
+    def _evict(self, keep):
+        total = sum(entry["bytes"] for entry in self.index.values())
+        for key, entry in sorted(self.index.items(), key=lambda item: item[1]["used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(os.path.join(self.path, key), ignore_errors=True)
+            total -= entry["bytes"]
+            del self.index[key]
+
+store = ImageStore()
@@ -1,17 +1,7 @@
-import cohere
 from rich import print
-from dotenv import dotenv_values
-
-
-env_vars = dotenv_values(".env")
-CohereAPIKey = env_vars.get("CohereAPIKey")
-
-
-if not CohereAPIKey:
-    raise ValueError("CohereAPIKey is missing from .env file!")
-
-
-co = cohere.Client(api_key=CohereAPIKey)
+from Services import CohereClient
+from FastIntent import ClassifyLocally, FastPathStats
+from DecisionCache import cache
 
 
 funcs = [
@@ -53,12 +43,31 @@ ChatHistory = [
     {"role": "Chatbot", "message": "general what is today's date, reminder 11:00pm 5th Aug dancing performance"},
 ]
 
-def FirstLayerDMM(prompt: str = "test"):
-    """Processes the user query and classifies it into predefined categories."""
-    
+def QuickDecision(prompt: str):
+    """Classifies a query without a network round trip, or returns None."""
+
+    # Answer trivially recognizable commands without a network round trip
+    local_decision = ClassifyLocally(prompt)
+    if local_decision:
+        stats = FastPathStats()
+        print(f"[cyan]Fast path decision:[/cyan] {local_decision} (hit rate {stats['hit_rate']:.0%})")
+        return local_decision
+
+    # Reuse the decision for a query we've already classified
+    cached_decision = cache.get(prompt)
+    if cached_decision:
+        stats = cache.stats()
+        print(f"[cyan]Cached decision:[/cyan] {cached_decision} (hit ratio {stats['hit_ratio']:.0%})")
+        return cached_decision
+
+    return None
+
+def CohereDecision(prompt: str):
+    """Classifies a query with Cohere and caches the decision."""
+
     try:
         
-        response = co.chat(
+        response = CohereClient().chat(
             model='command-r-plus',
             message=prompt,
             temperature=0.7,
@@ -102,8 +111,13 @@ def FirstLayerDMM(prompt: str = "test"):
         print("[yellow]Warning: Response contains '(query)', returning 'general' as fallback.[/yellow]")
         return [f"general {prompt}"]
 
+    cache.put(prompt, temp)
     return temp
 
+def FirstLayerDMM(prompt: str = "test"):
+    """Processes the user query and classifies it into predefined categories."""
+    return QuickDecision(prompt) or CohereDecision(prompt)
+
 if __name__ == "__main__":
     while True:
         user_input = input(">>> ")
@@ -0,0 +1,69 @@
+from bs4 import BeautifulSoup, SoupStrainer
+from urllib.parse import urlparse
+from HttpClient import GetSession
+import asyncio
+import aiohttp
+
+# A slow page is dropped rather than holding up the answer
+FetchTimeout = 3
+# Seconds the answer waits for snippets; whatever isn't ready by then is skipped
+SnippetDeadline = 1.0
+# Pages fetched at once from the same site, below the pool's own per-host limit
+MaxFetchesPerHost = 2
+# Characters kept from each page
+SnippetChars = 600
+# Bytes read from each page; the opening paragraphs are all we keep
+MaxPageBytes = 512 * 1024
+
+Headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"}
+
+# Only paragraph-like tags are parsed, which skips most of the page tree
+TextTagNames = ["p", "li", "h1", "h2", "h3"]
+TextTags = SoupStrainer(TextTagNames)
+
+def ExtractText(html, max_chars=SnippetChars):
+    """Reduce a page to a compact text snippet made of its first paragraphs."""
+    soup = BeautifulSoup(html, "html.parser", parse_only=TextTags)
+    parts = []
+    length = 0
+    for tag in soup.find_all(TextTagNames):
+        text = " ".join(tag.get_text(" ", strip=True).split())
+        if len(text) < 40:
+            continue  # Menus, buttons and captions
+        parts.append(text)
+        length += len(text) + 1
+        if length >= max_chars:
+            break
+    return " ".join(parts)[:max_chars]
+
+async def FetchSnippet(url, host_limits):
+    """Fetch one page and return its snippet, or "" if it is slow, missing, not HTML or unparsable."""
+    host = urlparse(url).netloc
+    limit = host_limits.setdefault(host, asyncio.Semaphore(MaxFetchesPerHost))
+    try:
+        session = await GetSession()
+        async with limit:
+            async with session.get(url, headers=Headers, timeout=aiohttp.ClientTimeout(total=FetchTimeout)) as response:
+                if response.status != 200 or "html" not in response.headers.get("Content-Type", ""):
+                    return ""
+                body = await response.content.read(MaxPageBytes)
+        html = body.decode(response.charset or "utf-8", errors="ignore")
+        # Parsing is CPU work; keep it off the shared loop
+        return await asyncio.to_thread(ExtractText, html)
+    except Exception:
+        # One bad page must not cost the answer the rest of its grounding
+        return ""
+
+async def FetchSnippets(urls, deadline=SnippetDeadline):
+    """Fetch all pages concurrently and return their snippets in the same order.
+
+    Pages not ready by the deadline are cancelled and get an empty snippet.
+    """
+    host_limits = {}
+    tasks = [asyncio.create_task(FetchSnippet(url, host_limits)) for url in urls]
+    if not tasks:
+        return []
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+    for task in pending:
+        task.cancel()
+    return [task.result() if task in done else "" for task in tasks]
@@ -0,0 +1,88 @@
+from collections import OrderedDict
+from json import load, dump
+import threading
+import copy
+import time
+import re
+import os
+
+def NormalizeQuery(Query):
+    """Lowercase a query, strip punctuation and collapse whitespace."""
+    return " ".join(re.sub(r"[^\w\s]", "", Query.lower()).split())
+
+class PersistentCache:
+    """LRU cache of JSON values keyed on the normalized query, saved to disk.
+
+    Every entry expires after ttl(value) seconds; subclasses override ttl()
+    with their own policy, and a TTL of zero or less keeps a value out of the
+    cache altogether.
+    """
+
+    def __init__(self, path, max_entries, default_ttl=0):
+        self.path = path
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries.update(
+                    (key, entry) for key, entry in load(f).items() if "value" in entry
+                )
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def _save(self):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            dump(self.entries, f)
+        os.replace(temp_path, self.path)
+
+    def ttl(self, value):
+        """Seconds a value stays valid."""
+        return self.default_ttl
+
+    def get(self, query):
+        """Return a copy of the cached value for a query, or None."""
+        key = NormalizeQuery(query)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry["expires"] < time.time():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry["value"])
+
+    def put(self, query, value):
+        """Cache a value unless its TTL says it must not be cached."""
+        ttl = self.ttl(value)
+        if ttl <= 0:
+            return
+        key = NormalizeQuery(query)
+        with self.lock:
+            self.entries[key] = {"value": copy.deepcopy(value), "expires": time.time() + ttl}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            try:
+                self._save()
+            except OSError as e:
+                print(f"Error saving {self.path}: {e}")
+
+    def stats(self):
+        """Return hit and miss counts and the hit ratio."""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+            }
@@ -0,0 +1,101 @@
+from email.utils import parsedate_to_datetime
+import datetime
+import asyncio
+import random
+import time
+
+class AdaptiveRateLimiter:
+    """Token bucket and concurrency window shared by every request to one API.
+
+    The bucket caps the sustained request rate. Both the rate and the number
+    of requests in flight shrink on each 429 and grow back slowly on success
+    (additive increase, multiplicative decrease). A Retry-After header pauses
+    every caller, not just the one that was rejected.
+    """
+
+    def __init__(self, rate=1.0, burst=4, max_concurrency=4, min_rate=0.05, max_rate=4.0):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.concurrency = float(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.requests = 0
+        self.rate_limited = 0
+        self.condition = None
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait for a free slot and a token."""
+        if self.condition is None:
+            self.condition = asyncio.Condition()
+
+        async with self.condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.blocked_until - now
+                if wait <= 0 and self.in_flight < int(self.concurrency):
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        self.in_flight += 1
+                        self.requests += 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+
+                try:
+                    # Wake up when a slot frees, or when the wait is over
+                    await asyncio.wait_for(self.condition.wait(), wait if wait > 0 else None)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, status, retry_after=None):
+        """Return a slot and adapt the limits to the response status."""
+        async with self.condition:
+            self.in_flight -= 1
+            if status == 429:
+                self.rate_limited += 1
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.concurrency = max(1.0, self.concurrency / 2)
+                if retry_after:
+                    self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            elif status < 400:
+                self.rate = min(self.max_rate, self.rate + 0.05)
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+            self.condition.notify_all()
+
+    @staticmethod
+    def backoff(attempt, retry_after=None, base=2.0):
+        """Delay before a retry: Retry-After plus jitter, or jittered exponential backoff."""
+        if retry_after:
+            return retry_after + random.uniform(0, 1)
+        return random.uniform(0, base * 2 ** attempt)
+
+    def stats(self):
+        return {
+            "rate": self.rate,
+            "concurrency": int(self.concurrency),
+            "requests": self.requests,
+            "rate_limited": self.rate_limited,
+        }
+
+def ParseRetryAfter(value):
+    """Return a Retry-After header (seconds or HTTP date) as seconds, or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
@@ -1,45 +1,64 @@
 from googlesearch import search
-from groq import Groq
-from json import load, dump
 import datetime
-from dotenv import dotenv_values
-import os
-
-# Load environment variables
-env_vars = dotenv_values(".env")
+from Config import env_vars
+from Services import GroqClient
+from ChatStore import store
+from ContextBuilder import PromptBuilder
+from ChatSummary import summary
+from SearchCache import cache
+from PageFetch import FetchSnippets
+from Runtime import RunSync
+from Grounding import SelectResults
 
 Username = env_vars.get("Username")
 Assistantname = env_vars.get("Assistantname")
-GroqAPIKey = env_vars.get("GroqAPIKey")
 
-# Initialize Groq client
-client = Groq(api_key=GroqAPIKey)
+# Fetch the result pages for richer grounding than titles and descriptions alone;
+# off by default since the answer waits up to SnippetDeadline for them
+SearchPageFetch = str(env_vars.get("SearchPageFetch", "False")).lower() == "true"
+
+# Results requested from the search engine; the grounding stage keeps the best of them
+NumResults = 8
 
 # System prompt
 System = f"""Hello, I am {Username}, You are a very accurate and advanced AI chatbot named {Assistantname} which has real-time up-to-date information from the internet.
 *** Provide Answers In a Professional Way, make sure to add full stops, commas, question marks, and use proper grammar.***
 *** Just answer the question from the provided data in a professional way. ***"""
 
-# Load chat history
-messages = []
-if not os.path.exists("Data"):
-    os.makedirs("Data")
-
-try:
-    with open(r"Data\ChatLog.json", "r") as f:
-        messages = load(f)
-except FileNotFoundError:
-    with open(r"Data\ChatLog.json", "w") as f:
-        dump([], f)
+def SearchResults(query):
+    """Return search results for a query, from the cache when they are fresh.
+
+    With SearchPageFetch enabled, the result pages are fetched concurrently
+    and each result that is ready by the deadline gets a short snippet of the
+    page's own text.
+    """
+    results = cache.get(query)
+    if results is not None:
+        return results
+
+    results = [
+        {"title": i.title, "description": i.description, "url": i.url, "content": ""}
+        for i in search(query, advanced=True, num_results=NumResults)
+    ]
+    if SearchPageFetch and results:
+        snippets = RunSync(FetchSnippets([result["url"] for result in results]))
+        for result, snippet in zip(results, snippets):
+            result["content"] = snippet
+    cache.put(query, results)
+    return results
 
 def GoogleSearch(query):
     """Perform a Google search and return formatted results."""
     try:
-        results = list(search(query, advanced=True, num_results=5))
+        # Keep only the most relevant, non-redundant results within the token budget
+        results = SelectResults(query, SearchResults(query))
         Answer = f"The search results for '{query}' are:\n[start]\n"
 
         for i in results:
-            Answer += f"Title: {i.title}\nDescription: {i.description}\n\n"
+            Answer += f"Title: {i['title']}\nDescription: {i['description']}\n"
+            if i["content"]:
+                Answer += f"Content: {i['content']}\n"
+            Answer += "\n"
 
         Answer += "[end]"
         return Answer
@@ -54,11 +73,12 @@ def AnswerModifier(Answer):
     modified_answer = '\n'.join(non_empty_lines)
     return modified_answer
 
-SystemChatBot = [
+# Shared by every request; each one derives its own builder from it
+StaticPrompt = PromptBuilder(static=[
     {"role": "system", "content": System},
     {"role": "user", "content": "Hi"},
     {"role": "assistant", "content": "Hello, how can I help you?"}
-]
+])
 
 def Information():
     """Return real-time information as a string."""
@@ -78,23 +98,31 @@ def Information():
     data += f"Time: {hour} hours, {minute} minutes, {second} seconds.\n"
     return data
 
-def RealtimeSearchEngine(prompt):
-    """Handle user queries using real-time search and Groq API."""
+def RealtimeSearchEngineStream(prompt):
+    """Yield the answer to a real-time query token by token as it arrives."""
     try:
-        # Load chat history
-        with open(r"Data\ChatLog.json", "r") as f:
-            messages = load(f)
+        # Load the conversation summary and the turns it doesn't cover
+        summary_messages, messages = summary.context()
 
         # Append user query to messages
-        messages.append({"role": "user", "content": prompt})
+        user_message = {"role": "user", "content": prompt}
+        messages.append(user_message)
+
+        # Assemble this request's prompt without touching shared state
+        prompt_builder = (
+            StaticPrompt
+            .with_grounding(GoogleSearch(prompt))
+            .with_summary(summary_messages)
+            .with_realtime(Information())
+        )
 
-        # Perform Google search and append results to SystemChatBot
-        SystemChatBot.append({"role": "system", "content": GoogleSearch(prompt)})
+        # Keep the prompt within the model's context window
+        context = prompt_builder.build(messages, max_tokens=2048)
 
         # Get chatbot response
-        completion = client.chat.completions.create(
+        completion = GroqClient().chat.completions.create(
             model="llama3-70b-8192",
-            messages=SystemChatBot + [{"role": "system", "content": Information()}] + messages,
+            messages=context,
             temperature=0.7,
             max_tokens=2048,
             top_p=1,
@@ -104,27 +132,29 @@ def RealtimeSearchEngine(prompt):
 
         Answer = ""
         for chunk in completion:
-            if chunk.choices[0].delta.content:
-                Answer += chunk.choices[0].delta.content
-
-        # Clean up the answer
-        Answer = Answer.strip().replace("</s>", "")
-
-        # Append assistant's response to messages
-        messages.append({"role": "assistant", "content": Answer})
-
-        # Save updated chat history
-        with open(r"Data\ChatLog.json", "w") as f:
-            dump(messages, f, indent=4)
-
-        # Remove Google search results from SystemChatBot
-        SystemChatBot.pop()
-
-        return AnswerModifier(Answer=Answer)
+            token = chunk.choices[0].delta.content
+            if not token:
+                continue
+            # Clean up the answer
+            token = token.replace("</s>", "")
+            if not Answer:
+                token = token.lstrip()
+            if token:
+                Answer += token
+                yield token
+        Answer = Answer.rstrip()
+
+        # Save the new turn to the chat log
+        store.append(user_message, {"role": "assistant", "content": Answer})
+        summary.maybe_refresh()
 
     except Exception as e:
         print(f"Error: {e}")
-        return "Sorry, an error occurred. Please try again."
+        yield "Sorry, an error occurred. Please try again."
+
+def RealtimeSearchEngine(prompt):
+    """Handle user queries using real-time search and Groq API."""
+    return AnswerModifier(Answer="".join(RealtimeSearchEngineStream(prompt)).strip())
 
 if __name__ == "__main__":
     while True:
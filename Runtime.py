@@ -0,0 +1,71 @@
+import asyncio
+import threading
+
+class AsyncRuntime:
+    """One asyncio event loop on a dedicated thread, shared by every async backend.
+
+    Coroutines submitted from any thread run on the same loop, so they can
+    overlap and share connection pools instead of each asyncio.run() call
+    building and tearing down its own loop.
+    """
+
+    def __init__(self):
+        self.loop = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self.lock:
+            if self.loop is not None:
+                return self.loop
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self.thread = threading.Thread(target=run, name="jarvis-runtime", daemon=True)
+            self.thread.start()
+            ready.wait()
+            self.loop = loop
+            return loop
+
+    def submit(self, coro):
+        """Schedule a coroutine on the runtime loop and return a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_started())
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the runtime loop and wait for its result."""
+        if threading.current_thread() is self.thread:
+            coro.close()
+            raise RuntimeError("RunSync() called from the runtime loop; await the coroutine instead.")
+        return self.submit(coro).result(timeout)
+
+runtime = AsyncRuntime()
+
+def Submit(coro):
+    """Schedule a coroutine on the shared loop without waiting for it."""
+    return runtime.submit(coro)
+
+def RunSync(coro, timeout=None):
+    """Sync facade for existing callers: run a coroutine on the shared loop and return its result."""
+    return runtime.run(coro, timeout)
+
+def Iterate(agen):
+    """Sync facade for async generators: yield each item as soon as the shared loop produces it."""
+    async def step():
+        return await agen.__anext__()
+
+    async def close():
+        await agen.aclose()
+
+    try:
+        while True:
+            try:
+                yield runtime.run(step())
+            except StopAsyncIteration:
+                return
+    finally:
+        runtime.run(close())
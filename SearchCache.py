@@ -0,0 +1,22 @@
+from PersistentCache import PersistentCache
+import os
+
+CachePath = os.path.join("Data", "SearchCache.json")
+
+# Entries kept before the least recently used ones are evicted
+MaxEntries = 200
+
+# Seconds search results stay valid; realtime answers must not go stale
+SearchTTL = 10 * 60
+
+class SearchCache(PersistentCache):
+    """Persistent LRU cache of web search results keyed on the normalized query."""
+
+    def __init__(self, path=CachePath, max_entries=MaxEntries):
+        super().__init__(path, max_entries, default_ttl=SearchTTL)
+
+    def ttl(self, results):
+        # Empty results are usually a transient failure; don't remember them
+        return self.default_ttl if results else 0
+
+cache = SearchCache()
@@ -0,0 +1,85 @@
+from Config import env_vars
+import importlib
+import threading
+import time
+
+class ServiceRegistry:
+    """Builds clients and backend modules on first use, once per process."""
+
+    def __init__(self):
+        self.factories = {}
+        self.instances = {}
+        self.timings = {}
+        self.lock = threading.Lock()
+        self.building = {}
+
+    def register(self, name, factory):
+        self.factories[name] = factory
+
+    def register_module(self, module_name):
+        if module_name not in self.factories:
+            self.register(module_name, lambda: importlib.import_module(module_name))
+
+    def get(self, name):
+        """Return the service, building it if needed. Concurrent callers share one build."""
+        if name in self.instances:
+            return self.instances[name]
+
+        with self.lock:
+            if name in self.instances:
+                return self.instances[name]
+            build_lock = self.building.setdefault(name, threading.Lock())
+
+        with build_lock:
+            if name not in self.instances:
+                start = time.perf_counter()
+                self.instances[name] = self.factories[name]()
+                self.timings[name] = time.perf_counter() - start
+        return self.instances[name]
+
+    def preload(self, names, on_done=None):
+        """Build services on a background thread, e.g. right after the window shows."""
+        def run():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"Error loading {name}: {e}")
+            if on_done:
+                on_done()
+
+        threading.Thread(target=run, daemon=True).start()
+
+registry = ServiceRegistry()
+
+def _groq():
+    from groq import Groq
+    return Groq(api_key=env_vars.get("GroqAPIKey"))
+
+def _cohere():
+    import cohere
+    CohereAPIKey = env_vars.get("CohereAPIKey")
+    if not CohereAPIKey:
+        raise ValueError("CohereAPIKey is missing from .env file!")
+    return cohere.Client(api_key=CohereAPIKey)
+
+registry.register("groq", _groq)
+registry.register("cohere", _cohere)
+
+def GroqClient():
+    """Return the shared Groq client."""
+    return registry.get("groq")
+
+def CohereClient():
+    """Return the shared Cohere client."""
+    return registry.get("cohere")
+
+def Lazy(module_name, attribute):
+    """Return a function that imports a backend module on first call and forwards to it."""
+    registry.register_module(module_name)
+
+    def call(*args, **kwargs):
+        return getattr(registry.get(module_name), attribute)(*args, **kwargs)
+
+    call.__name__ = attribute
+    return call
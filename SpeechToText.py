@@ -1,14 +1,15 @@
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
-from dotenv import dotenv_values
+from Config import env_vars
 import os
+from concurrent.futures import Future
 import mtranslate as mt
+import threading
+import json
 import time
 
-env_vars = dotenv_values(".env")
 InputLanguage = env_vars.get("InputLanguage")
 
 HtmlCode = '''<!DOCTYPE html>
@@ -22,39 +23,77 @@ HtmlCode = '''<!DOCTYPE html>
     <p id="output"></p>
     <script>
         const output = document.getElementById('output');
+        const transcripts = [];
         let recognition;
+        let listening = false;
+        let waiter = null;
+
+        // Hand a transcript to a waiting Python call, or queue it
+        function deliver(transcript) {
+            if (waiter) {
+                const callback = waiter;
+                waiter = null;
+                callback(transcript);
+            } else {
+                transcripts.push(transcript);
+            }
+        }
 
         function startRecognition() {
-            recognition = new webkitSpeechRecognition() || new SpeechRecognition();
-            recognition.lang = '';
-            recognition.continuous = true;
+            transcripts.length = 0;
+            listening = true;
+            if (!recognition) {
+                recognition = new (window.webkitSpeechRecognition || window.SpeechRecognition)();
+                recognition.lang = '';
+                recognition.continuous = true;
 
-            recognition.onresult = function(event) {
-                const transcript = event.results[event.results.length - 1][0].transcript;
-                output.textContent += transcript;
-            };
+                recognition.onresult = function(event) {
+                    const transcript = event.results[event.results.length - 1][0].transcript;
+                    output.textContent += transcript;
+                    deliver(transcript);
+                };
 
-            recognition.onend = function() {
+                recognition.onend = function() {
+                    if (listening) {
+                        recognition.start();
+                    }
+                };
+            }
+            try {
                 recognition.start();
-            };
-            recognition.start();
+            } catch (e) {
+                // Already running
+            }
         }
 
         function stopRecognition() {
-            recognition.stop();
+            listening = false;
+            if (recognition) {
+                recognition.stop();
+            }
             output.innerHTML = "";
         }
+
+        // Called through execute_async_script; resolves with the next transcript or null
+        function nextTranscript(timeout, callback) {
+            if (transcripts.length) {
+                callback(transcripts.shift());
+                return;
+            }
+            const timer = setTimeout(function() {
+                waiter = null;
+                callback(null);
+            }, timeout);
+            waiter = function(transcript) {
+                clearTimeout(timer);
+                callback(transcript);
+            };
+        }
     </script>
 </body>
 </html>'''
 
-HtmlCode = str(HtmlCode).replace("recognition.lang= '';", f"recognition.lang = '{InputLanguage}';")
-
-if not os.path.exists("Data"):
-    os.makedirs("Data")
-
-with open(r"Data\Voice.html", "w", encoding="utf-8") as f:
-    f.write(HtmlCode)
+HtmlCode = str(HtmlCode).replace("recognition.lang = '';", f"recognition.lang = '{InputLanguage}';")
 
 current_dir = os.getcwd()
 Link = f"file:///{current_dir}/Data/Voice.html"
@@ -66,8 +105,79 @@ chrome_options.add_argument("--use-fake-ui-for-media-stream")
 chrome_options.add_argument("--use-fake-device-for-media-stream")
 chrome_options.add_argument("--headless=new")
 
-service = Service(ChromeDriverManager().install())
-driver = webdriver.Chrome(service=service, options=chrome_options)
+# Resolved chromedriver path, reused instead of asking webdriver_manager on every launch
+DriverPathCache = os.path.join("Data", "ChromeDriverPath.json")
+DriverPathMaxAge = 7 * 24 * 3600
+
+def ResolveDriverPath(refresh=False):
+    """Return the chromedriver path, re-resolving it at most once a week."""
+    if not refresh:
+        try:
+            with open(DriverPathCache, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if os.path.exists(cached["path"]) and time.time() - cached["resolved"] < DriverPathMaxAge:
+                return cached["path"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    path = ChromeDriverManager().install()
+    with open(DriverPathCache, "w", encoding="utf-8") as f:
+        json.dump({"path": path, "resolved": time.time()}, f)
+    return path
+
+def LaunchRecognizer():
+    """Write Voice.html and start headless Chrome."""
+    with open(r"Data\Voice.html", "w", encoding="utf-8") as f:
+        f.write(HtmlCode)
+
+    try:
+        return webdriver.Chrome(service=Service(ResolveDriverPath()), options=chrome_options)
+    except Exception as e:
+        # The cached driver may no longer match the installed Chrome
+        print(f"Error launching Chrome, refreshing driver: {e}")
+        return webdriver.Chrome(service=Service(ResolveDriverPath(refresh=True)), options=chrome_options)
+
+RecognizerLock = threading.Lock()
+RecognizerFuture = None
+
+def WarmUpRecognizer():
+    """Start Chrome on a background thread; returns a future resolving to the driver."""
+    global RecognizerFuture
+    with RecognizerLock:
+        # Launch once, or again if the previous launch failed
+        if RecognizerFuture is None or (RecognizerFuture.done() and RecognizerFuture.exception() is not None):
+            future = Future()
+
+            def launch():
+                try:
+                    future.set_result(LaunchRecognizer())
+                except Exception as e:
+                    future.set_exception(e)
+
+            threading.Thread(target=launch, daemon=True).start()
+            RecognizerFuture = future
+        return RecognizerFuture
+
+def DiscardRecognizer(driver):
+    """Forget a driver whose session has died so the next call launches a new one."""
+    global RecognizerFuture, PageLoaded
+    with RecognizerLock:
+        future = RecognizerFuture
+        if future is not None and future.done() and future.exception() is None and future.result() is driver:
+            RecognizerFuture = None
+            PageLoaded = False
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+def SessionAlive(driver):
+    """Return whether Chrome and the WebDriver session still respond."""
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
 
 TempDirPath = os.path.join(current_dir, "Frontend", "Files")
 if not os.path.exists(TempDirPath):
@@ -98,34 +208,55 @@ def UniversalTranslator(Text):
     english_translation = mt.translate(Text, "en", "auto")
     return english_translation.capitalize()
 
+# Seconds to wait for speech before giving up
+RecognitionTimeout = 10
+
+PageLoaded = False
+
+def EnsureRecognitionPage(driver):
+    """Load Voice.html once and keep it running between recognitions."""
+    global PageLoaded
+    if not PageLoaded:
+        driver.get(Link)
+        PageLoaded = True
+
 def SpeechRecognition():
-    driver.get(Link)
+    global PageLoaded
+    driver = None
     try:
-        driver.find_element(By.ID, 'start').click()
+        driver = WarmUpRecognizer().result()
+        EnsureRecognitionPage(driver)
+        driver.execute_script("startRecognition();")
+
+        # Wait for the page to push a transcript instead of polling the DOM
+        driver.set_script_timeout(RecognitionTimeout + 5)
+        Text = driver.execute_async_script(
+            "nextTranscript(arguments[0], arguments[arguments.length - 1]);",
+            RecognitionTimeout * 1000
+        )
     except Exception as e:
-        print(f"Error starting recognition: {e}")
+        print(f"Error during recognition: {e}")
+        PageLoaded = False  # Reload the page next time
+        # A dead Chrome or WebDriver session can't be reused; relaunch next time
+        if driver is not None and not SessionAlive(driver):
+            DiscardRecognizer(driver)
         return None
+    finally:
+        try:
+            if PageLoaded:
+                driver.execute_script("stopRecognition();")
+        except Exception:
+            PageLoaded = False
 
-    timeout = 10  # Wait up to 10 seconds for speech
-    start_time = time.time()
+    if not Text:
+        print("No speech detected within timeout.")
+        return None
 
-    while time.time() - start_time < timeout:
-        try:
-            Text = driver.find_element(By.ID, "output").text
-            if Text:
-                driver.find_element(By.ID, 'end').click()
-                if InputLanguage.lower() == "en" or "en" in InputLanguage.lower():
-                    return QueryModifier(Text)
-                else:
-                    SetAssistantStatus("Translating...")
-                    return QueryModifier(UniversalTranslator(Text))
-        except Exception as e:
-            print(f"Error during recognition: {e}")
-        time.sleep(0.1)  # Small delay to avoid busy-waiting
-
-    driver.find_element(By.ID, 'end').click()
-    print("No speech detected within timeout.")
-    return None
+    if InputLanguage.lower() == "en" or "en" in InputLanguage.lower():
+        return QueryModifier(Text)
+    else:
+        SetAssistantStatus("Translating...")
+        return QueryModifier(UniversalTranslator(Text))
 
 if __name__ == "__main__":
     while True:
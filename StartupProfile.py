@@ -0,0 +1,40 @@
+import builtins
+import time
+import sys
+import os
+
+# Enable with JARVIS_PROFILE_STARTUP=1 or --profile-startup
+Enabled = os.environ.get("JARVIS_PROFILE_STARTUP") == "1" or "--profile-startup" in sys.argv
+
+StartTime = time.perf_counter()
+Timings = []  # (module, self seconds, cumulative seconds)
+
+_original_import = builtins.__import__
+_stack = []
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+
+    _stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        children = _stack.pop()
+        if _stack:
+            _stack[-1] += elapsed
+        Timings.append((name, elapsed - children, elapsed))
+
+def Start():
+    """Start timing imports; call before importing the backends."""
+    global StartTime
+    StartTime = time.perf_counter()
+    builtins.__import__ = _timed_import
+
+def Report(label="Time to interactive window", top=15):
+    """Print elapsed time since Start() and the slowest imports so far."""
+    print(f"{label}: {time.perf_counter() - StartTime:.3f}s")
+    for name, own, cumulative in sorted(Timings, key=lambda timing: timing[2], reverse=True)[:top]:
+        print(f"  {cumulative * 1000:8.1f} ms  (self {own * 1000:7.1f} ms)  {name}")
@@ -3,95 +3,377 @@ import random
 import asyncio
 import edge_tts
 import os
-from dotenv import dotenv_values
+import io
+import re
+import queue
+import threading
+import itertools
+import hashlib
+from collections import OrderedDict
+from Config import env_vars
+from Runtime import RunSync, Submit
 
-# Load environment variables
-env_vars = dotenv_values(".env")
 AssistantVoice = env_vars.get("AssistantVoice")
+Pitch = '+5Hz'
+Rate = '+13%'
 
-# Ensure the Data directory exists
-if not os.path.exists("Data"):
-    os.makedirs("Data")
+# Synthesized speech cache
+SpeechCachePath = os.path.join("Data", "SpeechCache")
+MaxSpeechCacheBytes = 50 * 1024 * 1024
+MaxCachedTextLength = 300
+# Sentences remembered to tell repeated phrases from one-off ones
+MaxSeenPhrases = 2000
 
-async def TextToAudioFile(text) -> None:
-    """Convert text to speech and save it as an MP3 file."""
-    file_path = r"Data\speech.mp3"
+class SpeechCache:
+    """Content-addressed MP3 cache on disk with size-bounded LRU eviction.
 
-    # Remove existing file if it exists
-    if os.path.exists(file_path):
-        os.remove(file_path)
+    Files are named after a hash of (text, voice, pitch, rate). Sizes and use
+    order are kept in memory, loaded once from the directory; modification
+    times carry the use order across restarts.
+    """
 
-    # Generate speech using Edge TTS
-    communicate = edge_tts.Communicate(text, AssistantVoice, pitch='+5Hz', rate='+13%')
-    await communicate.save(file_path)
+    def __init__(self, path=SpeechCachePath, max_bytes=MaxSpeechCacheBytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+        files = sorted(
+            (entry.stat().st_mtime, entry.name, entry.stat().st_size)
+            for entry in os.scandir(self.path) if entry.is_file() and entry.name.endswith(".mp3")
+        )
+        self.entries = OrderedDict((name, size) for _, name, size in files)
+        self.size = sum(self.entries.values())
 
-def TTS(Text, stop_callback=lambda: True):
-    """Play text-to-speech audio using Pygame with a stop callback."""
-    try:
-        # Convert text to speech and save as MP3
-        asyncio.run(TextToAudioFile(Text))
+    def _file_name(self, text, voice, pitch, rate):
+        key = hashlib.sha256(f"{voice}\0{pitch}\0{rate}\0{text}".encode("utf-8")).hexdigest()
+        return f"{key}.mp3"
+
+    def get(self, text, voice=AssistantVoice, pitch=Pitch, rate=Rate):
+        """Return cached audio, or None on a miss."""
+        name = self._file_name(text, voice, pitch, rate)
+        with self.lock:
+            if name not in self.entries:
+                return None
+            self.entries.move_to_end(name)
+        file_path = os.path.join(self.path, name)
+        try:
+            with open(file_path, "rb") as f:
+                audio = f.read()
+            os.utime(file_path)
+            return audio
+        except OSError:
+            with self.lock:
+                self.size -= self.entries.pop(name, 0)
+            return None
+
+    def put(self, text, audio, voice=AssistantVoice, pitch=Pitch, rate=Rate):
+        """Store audio and evict the least recently used files over the size limit."""
+        if not audio:
+            return
+        name = self._file_name(text, voice, pitch, rate)
+        file_path = os.path.join(self.path, name)
+        temp_path = f"{file_path}.{threading.get_ident()}.tmp"
+        with self.lock:
+            try:
+                with open(temp_path, "wb") as f:
+                    f.write(audio)
+                os.replace(temp_path, file_path)
+                self.size += len(audio) - self.entries.pop(name, 0)
+                self.entries[name] = len(audio)
+                self._evict()
+            except OSError as e:
+                print(f"Error caching speech: {e}")
+
+    def _evict(self):
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            name, size = self.entries.popitem(last=False)
+            self.size -= size
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass
+
+speech_cache = SpeechCache()
+
+# Phrases always worth caching: the canned responses and anything registered with PinPhrases()
+PinnedPhrases = set()
+# How often each recent sentence was spoken, to cache only the ones that repeat
+SeenPhrases = OrderedDict()
+SeenLock = threading.Lock()
+
+def PinPhrases(texts):
+    """Mark fixed phrases, such as confirmations, as always cacheable."""
+    PinnedPhrases.update(texts)
+
+def IsCacheable(text):
+    """Pinned phrases are cached right away, other sentences once they repeat."""
+    if text in PinnedPhrases:
+        return True
+    if len(text) > MaxCachedTextLength:
+        return False
+    with SeenLock:
+        count = SeenPhrases.pop(text, 0) + 1
+        SeenPhrases[text] = count
+        if len(SeenPhrases) > MaxSeenPhrases:
+            SeenPhrases.popitem(last=False)
+    return count > 1
+
+async def TextToAudio(text) -> bytes:
+    """Convert text to speech and return the MP3 audio in memory."""
+    communicate = edge_tts.Communicate(text, AssistantVoice, pitch=Pitch, rate=Rate)
+    audio = bytearray()
+    async for chunk in communicate.stream():
+        if chunk["type"] == "audio":
+            audio.extend(chunk["data"])
+    return bytes(audio)
 
-        # Initialize Pygame mixer
-        pygame.mixer.init()
+async def SpeechAudio(text) -> bytes:
+    """Return speech audio for text, using the cache for pinned and repeated phrases."""
+    if not IsCacheable(text):
+        return await TextToAudio(text)
+    audio = await asyncio.to_thread(speech_cache.get, text)
+    if audio is None:
+        audio = await TextToAudio(text)
+        # Write in the background; playback doesn't wait for the disk
+        asyncio.get_running_loop().run_in_executor(None, speech_cache.put, text, audio)
+    return audio
 
-        # Load and play the MP3 file
-        pygame.mixer.music.load(r"Data\speech.mp3")
-        pygame.mixer.music.play()
+def LoadAudio(audio):
+    """Load in-memory MP3 audio into the Pygame music player."""
+    pygame.mixer.music.load(io.BytesIO(audio), "mp3")
 
-        # Wait for the audio to finish playing or until stopped
-        while pygame.mixer.music.get_busy():
+# Clip priorities, lower plays first
+UrgentPriority = 0
+NormalPriority = 1
+
+class Clip:
+    """One queued piece of audio and its playback state."""
+
+    def __init__(self, audio, priority):
+        self.audio = audio
+        self.priority = priority
+        self.done = threading.Event()
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def wait(self, stop_callback=lambda: True):
+        """Block until the clip has played; returns False if it was stopped."""
+        while not self.done.wait(0.1):
             if not stop_callback():  # Check if the GUI signals to stop
-                pygame.mixer.music.stop()
+                self.cancel()
+                self.done.wait()
                 return False
-            pygame.time.Clock().tick(10)
+        return not self.cancelled.is_set()
 
-        return True
+class PlaybackEngine:
+    """Long-lived player: one mixer, a priority queue of clips and a playback thread.
+
+    All Pygame calls happen on the playback thread, which is started on first
+    use so importing this module doesn't open the audio device.
+    """
+
+    def __init__(self):
+        self.clips = queue.PriorityQueue()
+        self.sequence = itertools.count()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.current = None
+
+    def _ensure_started(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+
+    def play(self, audio, priority=NormalPriority, interrupt=False):
+        """Queue audio for playback and return its Clip.
+
+        With interrupt=True, the current clip and every queued clip of the
+        same or lower priority are cancelled first.
+        """
+        if interrupt:
+            self.interrupt(priority)
+        clip = Clip(audio, priority)
+        self._ensure_started()
+        self.clips.put((priority, next(self.sequence), clip))
+        return clip
+
+    def interrupt(self, priority=None):
+        """Cancel the current clip and queued ones of the given priority or lower."""
+        with self.clips.mutex:
+            queued = [item[2] for item in self.clips.queue]
+        for clip in queued + [self.current]:
+            if clip is not None and (priority is None or clip.priority >= priority):
+                clip.cancel()
+
+    def _run(self):
+        try:
+            pygame.mixer.init()
+        except Exception as e:
+            print(f"Error in TTS: {e}")
+        clock = pygame.time.Clock()
+
+        while True:
+            clip = self.clips.get()[2]
+            if clip.cancelled.is_set():
+                clip.done.set()
+                continue
+
+            self.current = clip
+            try:
+                LoadAudio(clip.audio)
+                pygame.mixer.music.play()
+
+                # Wait for the audio to finish playing or until cancelled
+                while pygame.mixer.music.get_busy():
+                    if clip.cancelled.is_set():
+                        pygame.mixer.music.stop()
+                        break
+                    clock.tick(20)
+            except Exception as e:
+                print(f"Error in TTS: {e}")
+                clip.cancel()
+            finally:
+                self.current = None
+                clip.done.set()
+
+engine = PlaybackEngine()
+
+def StopSpeaking():
+    """Barge in: cancel whatever is playing or queued."""
+    engine.interrupt()
+
+def TTS(Text, stop_callback=lambda: True):
+    """Play text-to-speech audio using the playback engine with a stop callback."""
+    try:
+        # Convert text to speech in memory
+        audio = RunSync(SpeechAudio(Text))
+
+        # Queue the audio and wait for it to finish playing or until stopped
+        return engine.play(audio).wait(stop_callback)
 
     except Exception as e:
         print(f"Error in TTS: {e}")
         return False
 
-    finally:
-        # Clean up Pygame mixer
+# Canned endings used when only the start of a long answer is spoken
+responses = [
+    "The rest of the result has been printed to the chat screen, kindly check it out sir.",
+    "The rest of the text is now on the chat screen, sir, please check it.",
+    "You can see the rest of the text on the chat screen, sir.",
+    "The remaining part of the text is now on the chat screen, sir.",
+    "Sir, you'll find more text on the chat screen for you to see.",
+    "The rest of the answer is now on the chat screen, sir.",
+    "Sir, please look at the chat screen, the rest of the answer is there.",
+    "You'll find the complete answer on the chat screen, sir.",
+    "The next part of the text is on the chat screen, sir.",
+    "Sir, please check the chat screen for more information.",
+    "There's more text on the chat screen for you, sir.",
+    "Sir, take a look at the chat screen for additional text.",
+    "You'll find more to read on the chat screen, sir.",
+    "Sir, check the chat screen for the rest of the text.",
+    "The chat screen has the rest of the text, sir.",
+    "There's more to see on the chat screen, sir, please look.",
+    "Sir, the chat screen holds the continuation of the text.",
+    "You'll find the complete answer on the chat screen, kindly check it out sir.",
+    "Please review the chat screen for the rest of the text, sir.",
+    "Sir, look at the chat screen for the complete answer."
+]
+PinPhrases(responses)
+
+def WarmSpeechCache():
+    """Pre-render the canned responses in the background so they play instantly."""
+    async def warm():
         try:
-            pygame.mixer.music.stop()
-            pygame.mixer.quit()
+            for text in responses:
+                await SpeechAudio(text)
         except Exception as e:
-            print(f"Error in finally block: {e}")
+            print(f"Error warming speech cache: {e}")
+
+    Submit(warm())
+
+SentenceEnd = re.compile(r"(?<=[.!?])\s+")
+
+def SplitSentences(Chunks):
+    """Yield complete sentences from a stream of text chunks."""
+    buffer = ""
+    for chunk in Chunks:
+        buffer += chunk
+        parts = SentenceEnd.split(buffer)
+        buffer = parts.pop()
+        for sentence in parts:
+            if sentence.strip():
+                yield sentence.strip()
+    if buffer.strip():
+        yield buffer.strip()
+
+def SpeakableSentences(Chunks):
+    """Apply the long-answer policy of TextToSpeech to a stream of text.
+
+    The first two sentences are yielded right away. Later ones are held back
+    until it is clear whether the answer is short enough to read in full;
+    otherwise a canned pointer to the chat screen is spoken instead.
+    """
+    held = []
+    length = 0
+    for i, sentence in enumerate(SplitSentences(Chunks)):
+        length += len(sentence)
+        if i < 2:
+            yield sentence
+            continue
+        held.append(sentence)
+        if i >= 4 and length >= 250:
+            yield random.choice(responses)
+            return
+    yield from held
+
+def TTSStream(Sentences, stop_callback=lambda: True):
+    """Speak a stream of sentences, synthesizing each one while the previous one plays."""
+    clips = queue.Queue(maxsize=1)
+    stopped = threading.Event()
+
+    def synthesize():
+        try:
+            for sentence in Sentences:
+                if stopped.is_set():
+                    break
+                clips.put(engine.play(RunSync(SpeechAudio(sentence))))
+        except Exception as e:
+            print(f"Error in TTS: {e}")
+        finally:
+            clips.put(None)
+
+    threading.Thread(target=synthesize, daemon=True).start()
+
+    completed = True
+    while True:
+        clip = clips.get()
+        if clip is None:
+            break
+        if not completed:
+            clip.cancel()
+            continue
+        if not clip.wait(stop_callback):
+            stopped.set()
+            completed = False
+    return completed
+
+def TextToSpeechStream(Chunks, stop_callback=lambda: True):
+    """Start speaking a streamed answer as soon as its first sentence is complete."""
+    return TTSStream(SpeakableSentences(Chunks), stop_callback)
 
 def TextToSpeech(Text, stop_callback=lambda: True):
     """Handle text-to-speech for long or short text with a stop callback."""
     Data = str(Text).split(".")
 
-    responses = [
-        "The rest of the result has been printed to the chat screen, kindly check it out sir.",
-        "The rest of the text is now on the chat screen, sir, please check it.",
-        "You can see the rest of the text on the chat screen, sir.",
-        "The remaining part of the text is now on the chat screen, sir.",
-        "Sir, you'll find more text on the chat screen for you to see.",
-        "The rest of the answer is now on the chat screen, sir.",
-        "Sir, please look at the chat screen, the rest of the answer is there.",
-        "You'll find the complete answer on the chat screen, sir.",
-        "The next part of the text is on the chat screen, sir.",
-        "Sir, please check the chat screen for more information.",
-        "There's more text on the chat screen for you, sir.",
-        "Sir, take a look at the chat screen for additional text.",
-        "You'll find more to read on the chat screen, sir.",
-        "Sir, check the chat screen for the rest of the text.",
-        "The chat screen has the rest of the text, sir.",
-        "There's more to see on the chat screen, sir, please look.",
-        "Sir, the chat screen holds the continuation of the text.",
-        "You'll find the complete answer on the chat screen, kindly check it out sir.",
-        "Please review the chat screen for the rest of the text, sir.",
-        "Sir, look at the chat screen for the complete answer."
-    ]
-
     # Handle long text by splitting it into smaller parts
     if len(Data) > 4 and len(Text) >= 250:
         short_text = " ".join(Text.split(".")[0:2]) + ". " + random.choice(responses)
-        return TTS(short_text, stop_callback)
+        return TTSStream(SplitSentences([short_text]), stop_callback)
     else:
-        return TTS(Text, stop_callback)
+        return TTSStream(SplitSentences([str(Text)]), stop_callback)
 
 if __name__ == "__main__":
     while True:
@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+import os
+
+# Gallery tiles are square; SDXL originals are 1024x1024
+ThumbnailSize = (160, 160)
+
+# Decoding and resizing happen here, never on the Tk thread
+pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="thumbnail")
+
+def ThumbnailPath(image_path, size=ThumbnailSize):
+    """Where the thumbnail of an image is cached, next to the original."""
+    root, _ = os.path.splitext(image_path)
+    return f"{root}.thumb{size[0]}x{size[1]}.jpg"
+
+def MakeThumbnail(image_path, size=ThumbnailSize):
+    """Return a loaded thumbnail of an image, creating its disk cache on first use.
+
+    JPEG draft mode lets the decoder scale down by a power of two while
+    decoding, and thumbnail() reduces before the final resample, so the full
+    resolution image is never materialized.
+    """
+    thumb_path = ThumbnailPath(image_path, size)
+    try:
+        if os.path.getmtime(thumb_path) >= os.path.getmtime(image_path):
+            with Image.open(thumb_path) as thumb:
+                thumb.load()
+                return thumb.copy()
+    except OSError:
+        pass
+
+    with Image.open(image_path) as img:
+        img.draft("RGB", size)
+        img = img.convert("RGB")
+    img.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+    temp_path = thumb_path + ".tmp"
+    img.save(temp_path, "JPEG", quality=85)
+    os.replace(temp_path, thumb_path)
+    return img
+
+def LoadImage(image_path):
+    """Decode a full resolution image; used when a thumbnail is clicked."""
+    with Image.open(image_path) as img:
+        img.load()
+        return img.copy()
+
+def SubmitThumbnail(image_path, size=ThumbnailSize):
+    return pool.submit(MakeThumbnail, image_path, size)
+
+def SubmitOriginal(image_path):
+    return pool.submit(LoadImage, image_path)